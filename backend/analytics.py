@@ -0,0 +1,106 @@
+import json
+from typing import Callable
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .database import cache_ttl
+from .models import Bid, Tender
+from .shared_cache import get_local_cache, get_shared_cache, invalidate
+
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+IQR_FACTOR = 1.5
+
+
+def price_statistics(bid_ids: list, prices) -> dict:
+    prices = np.asarray(prices, dtype=np.float64)
+    q10, q25, q50, q75, q90 = np.quantile(prices, QUANTILES)
+    iqr = q75 - q25
+    mean = prices.mean()
+    std = prices.std()
+    z_scores = (prices - mean) / std if std > 0 else np.zeros_like(prices)
+    low = prices < q25 - IQR_FACTOR * iqr
+    high = prices > q75 + IQR_FACTOR * iqr
+    return {
+        "count": int(prices.size),
+        "min": float(prices.min()),
+        "max": float(prices.max()),
+        "mean": float(mean),
+        "std": float(std),
+        "quantiles": {
+            "p10": float(q10),
+            "p25": float(q25),
+            "p50": float(q50),
+            "p75": float(q75),
+            "p90": float(q90),
+        },
+        "iqr": float(iqr),
+        "outliers": [
+            {
+                "bid_id": str(bid_ids[i]),
+                "price": float(prices[i]),
+                "z_score": float(z_scores[i]),
+                "kind": "LOW" if low[i] else "HIGH",
+            }
+            for i in np.flatnonzero(low | high)
+        ],
+    }
+
+
+def tender_price_analytics(db: Session, tender_id) -> dict:
+    rows = db.execute(
+        select(Bid.id, Bid.price).where(
+            Bid.tender_id == tender_id, Bid.price.is_not(None)
+        )
+    ).all()
+    if not rows:
+        return {"tender_id": str(tender_id), "count": 0}
+    bid_ids, prices = zip(*rows)
+    return {"tender_id": str(tender_id), **price_statistics(bid_ids, prices)}
+
+
+def organization_price_analytics(db: Session, organization_id) -> list[dict]:
+    # Все цены организации одним запросом, отсортированные по тендеру;
+    # границы групп находятся по смене tender_id.
+    rows = db.execute(
+        select(Bid.tender_id, Bid.id, Bid.price)
+        .join(Tender, Bid.tender_id == Tender.id)
+        .where(Tender.organization_id == organization_id, Bid.price.is_not(None))
+        .order_by(Bid.tender_id)
+    ).all()
+    if not rows:
+        return []
+    tender_ids, bid_ids, prices = zip(*rows)
+    tender_ids = np.array(tender_ids, dtype=object)
+    prices = np.asarray(prices, dtype=np.float64)
+    starts = np.flatnonzero(tender_ids[1:] != tender_ids[:-1]) + 1
+    return [
+        {
+            "tender_id": str(tender_ids[group[0]]),
+            **price_statistics(bid_ids[group[0] : group[-1] + 1], prices[group]),
+        }
+        for group in np.split(np.arange(len(rows)), starts)
+    ]
+
+
+def tender_key(tender_id) -> str:
+    return f"tender:{tender_id}"
+
+
+def organization_key(organization_id) -> str:
+    return f"organization:{organization_id}"
+
+
+def cached(db: Session, key: str, load: Callable[[], object]) -> bytes:
+    def dump() -> bytes:
+        return json.dumps(load()).encode()
+
+    # Без общего кэша результат держит кэш процесса.
+    cache = get_shared_cache() or get_local_cache()
+    return cache.get_or_set("analytics", key, dump, cache_ttl(db))
+
+
+def invalidate_prices(tender_id, organization_id):
+    invalidate("analytics", tender_key(tender_id))
+    invalidate("analytics", organization_key(organization_id))
@@ -1,16 +1,112 @@
-from fastapi import FastAPI
-from backend.endpoints import router
-from backend.database import create_tables
+import logging
 from contextlib import asynccontextmanager
+from time import perf_counter
+
+from fastapi import FastAPI
+
+from backend import metrics
+from backend.audit import get_audit_log
+from backend.endpoints import router, HEALTH_PATHS
+from backend.export import router as export_router
+from backend.database import (
+    LastWriteCookieMiddleware,
+    create_tables,
+    dispose_engine,
+    warm_up_pool,
+)
+from backend.deadline import CancelOnDisconnectMiddleware
+from backend.idempotency import IdempotencyMiddleware, IdempotencyStore
+from backend.profiler import ProfilerMiddleware
+from backend.ratelimit import RateLimitMiddleware, build_bucket_store
+from backend.settings import get_project_settings
+
+logger = logging.getLogger(__name__)
+
+
+class FirstRequestMiddleware:
+    # Замеряет время до первого рабочего запроса; после него только
+    # пропускает запросы дальше.
+    def __init__(self, app, state):
+        self.app = app
+        self.state = state
+
+    async def __call__(self, scope, receive, send):
+        if self.state.first_request_seen or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+        if not self.state.first_request_seen and scope["path"] not in HEALTH_PATHS:
+            self.state.first_request_seen = True
+            seconds = perf_counter() - self.state.created_at
+            metrics.set_gauge("time_to_first_request_seconds", seconds)
+            logger.info("First request served %.3fs after start", seconds)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    create_tables()
+    settings = get_project_settings()
+    if settings.DB_CREATE_TABLES:
+        create_tables()
+    warm_up_pool(settings.DB_POOL_WARMUP)
+    startup_seconds = perf_counter() - app.state.created_at
+    metrics.set_gauge("startup_seconds", startup_seconds)
+    logger.info("Startup finished in %.3fs", startup_seconds)
+    audit_log = get_audit_log()
+    audit_log.start()
+    app.state.ready = True
     yield
+    app.state.ready = False
+    await audit_log.stop()
+    dispose_engine()
 
 
 def create_app() -> FastAPI:
     app = FastAPI(lifespan=lifespan)
+    app.state.created_at = perf_counter()
+    app.state.ready = False
+    app.state.first_request_seen = False
     app.include_router(router)
+    app.include_router(export_router)
+
+    settings = get_project_settings()
+    if settings.POSTGRES_REPLICA_CONN:
+        app.add_middleware(
+            LastWriteCookieMiddleware, max_age=settings.REPLICA_STICKY_SECONDS
+        )
+    if settings.IDEMPOTENCY_ENABLED:
+        app.add_middleware(
+            IdempotencyMiddleware,
+            store=IdempotencyStore(
+                settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LEASE_SECONDS
+            ),
+            wait_seconds=settings.IDEMPOTENCY_WAIT_SECONDS,
+        )
+    # Внутри лимитера: отклоненные запросы не доходят до чтения тела.
+    if settings.CANCEL_ON_DISCONNECT:
+        app.add_middleware(CancelOnDisconnectMiddleware)
+    if settings.RATE_LIMIT_ENABLED:
+        app.add_middleware(
+            RateLimitMiddleware,
+            store=build_bucket_store(settings.RATE_LIMIT_REDIS_URL),
+            user_rate=settings.RATE_LIMIT_USER_RATE,
+            user_burst=settings.RATE_LIMIT_USER_BURST,
+            ip_rate=settings.RATE_LIMIT_IP_RATE,
+            ip_burst=settings.RATE_LIMIT_IP_BURST,
+            route_costs=settings.RATE_LIMIT_ROUTE_COSTS,
+            max_in_flight=settings.MAX_IN_FLIGHT_REQUESTS,
+        )
+
+    if settings.PROFILER_DIR and (
+        settings.PROFILER_TOKEN or settings.PROFILER_SAMPLE_RATE > 0
+    ):
+        app.add_middleware(
+            ProfilerMiddleware,
+            output_dir=settings.PROFILER_DIR,
+            token=settings.PROFILER_TOKEN,
+            sample_rate=settings.PROFILER_SAMPLE_RATE,
+            interval=settings.PROFILER_INTERVAL_SECONDS,
+        )
+
+    app.add_middleware(FirstRequestMiddleware, state=app.state)
+
     return app
@@ -0,0 +1,86 @@
+import argparse
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal, get_engine
+from .models import (
+    ArchivedBid,
+    ArchivedBidReview,
+    ArchivedTender,
+    Bid,
+    BidReview,
+    Tender,
+    TenderStatus,
+)
+from .settings import get_project_settings
+from .shared_cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+
+def move_rows(db: Session, source, target, condition):
+    columns = [column.name for column in target.__table__.columns]
+    db.execute(
+        insert(target).from_select(
+            columns,
+            select(*[getattr(source, name) for name in columns]).where(condition),
+        )
+    )
+    db.execute(
+        delete(source).where(condition).execution_options(synchronize_session=False)
+    )
+
+
+def archive_closed_tenders(db: Session, older_than: datetime, batch_size: int) -> int:
+    archived = 0
+    while True:
+        tender_ids = (
+            db.execute(
+                select(Tender.id)
+                .where(
+                    Tender.status == TenderStatus.CLOSED,
+                    Tender.updated_at < older_than,
+                )
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+        if not tender_ids:
+            return archived
+        # Каждая пачка переносится в своей транзакции: сначала дочерние строки,
+        # чтобы не нарушать внешние ключи горячих таблиц.
+        bid_ids = select(Bid.id).where(Bid.tender_id.in_(tender_ids))
+        move_rows(db, BidReview, ArchivedBidReview, BidReview.bid_id.in_(bid_ids))
+        move_rows(db, Bid, ArchivedBid, Bid.tender_id.in_(tender_ids))
+        move_rows(db, Tender, ArchivedTender, Tender.id.in_(tender_ids))
+        db.commit()
+        invalidate("tenders")
+        archived += len(tender_ids)
+        logger.info("Archived %d closed tenders", archived)
+
+
+def main():
+    settings = get_project_settings()
+    parser = argparse.ArgumentParser(
+        description="Перенос закрытых тендеров с предложениями и отзывами в архив."
+    )
+    parser.add_argument(
+        "--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    older_than = datetime.now() - timedelta(days=args.older_than_days)
+    with SessionLocal(bind=get_engine()) as db:
+        archived = archive_closed_tenders(db, older_than, args.batch_size)
+    print(f"Archived {archived} tenders")
+
+
+if __name__ == "__main__":
+    main()
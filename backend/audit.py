@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import queue
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from . import metrics
+from .database import get_engine
+from .models import AuditEvent
+from .settings import get_project_settings
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+    def __init__(
+        self,
+        max_queue_size: int,
+        batch_size: int,
+        flush_interval: float,
+        block_seconds: float,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_seconds = block_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        action: str,
+        entity_type: str,
+        entity_id,
+        actor_id=None,
+        details: Optional[dict] = None,
+    ):
+        event = {
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "actor_id": actor_id,
+            "details": details,
+            "created_at": datetime.now(),
+        }
+        try:
+            # При переполненной очереди запрос ждет не дольше block_seconds,
+            # после чего событие отбрасывается и учитывается в метриках.
+            self._queue.put(event, timeout=self.block_seconds)
+        except queue.Full:
+            metrics.inc("audit.dropped")
+            logger.warning("Audit queue is full, dropping %s", action)
+            return
+        metrics.inc("audit.enqueued")
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await asyncio.to_thread(self.flush)
+
+    def flush(self):
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            try:
+                with get_engine().begin() as conn:
+                    conn.execute(insert(AuditEvent), batch)
+            except SQLAlchemyError:
+                metrics.inc("audit.flush_errors")
+                logger.exception("Failed to write %d audit events", len(batch))
+                return
+            metrics.inc("audit.flushed", len(batch))
+
+
+@lru_cache
+def get_audit_log() -> AuditLog:
+    settings = get_project_settings()
+    return AuditLog(
+        settings.AUDIT_QUEUE_SIZE,
+        settings.AUDIT_BATCH_SIZE,
+        settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+        settings.AUDIT_ENQUEUE_BLOCK_SECONDS,
+    )
@@ -1,13 +1,22 @@
+import hashlib
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.orm import Session
 from jose import jwt
 from passlib.context import CryptContext
 from datetime import timedelta, datetime, timezone
 
+from . import metrics
+
 from .database import get_db
-from .models import Employee
-from .settings import project_settings
+from .models import Employee, RefreshToken
+from .settings import get_project_settings
 
 router = APIRouter()
 
@@ -25,6 +34,15 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
+def hash_passwords(passwords: list[str]) -> list[str]:
+    # bcrypt отпускает GIL на время хэширования, поэтому потоки загружают все ядра.
+    if len(passwords) <= 1:
+        return [get_password_hash(password) for password in passwords]
+    workers = min(len(passwords), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(get_password_hash, passwords))
+
+
 def authenticate_user(username: str, password: str, db: Session):
     user = db.query(Employee).filter(Employee.username == username).first()
     if not user:
@@ -42,11 +60,75 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(
-        to_encode, project_settings.SECRET_KEY, algorithm=ALGORITHM
+        to_encode, get_project_settings().SECRET_KEY, algorithm=ALGORITHM
     )
     return encoded_jwt
 
 
+def hash_refresh_token(token: str) -> str:
+    # Токен случайный и длинный, поэтому медленный хэш вроде bcrypt не нужен.
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue_refresh_token(db: Session, user_id) -> str:
+    now = datetime.now()
+    db.execute(
+        delete(RefreshToken).where(
+            RefreshToken.user_id == user_id, RefreshToken.expires_at < now
+        )
+    )
+    token = secrets.token_urlsafe(32)
+    db.execute(
+        insert(RefreshToken).values(
+            token_hash=hash_refresh_token(token),
+            user_id=user_id,
+            expires_at=now
+            + timedelta(days=get_project_settings().REFRESH_TOKEN_EXPIRE_DAYS),
+        )
+    )
+    return token
+
+
+def revoke_refresh_tokens(db: Session, user_id) -> int:
+    return db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked.is_(False))
+        .values(revoked=True)
+    ).rowcount
+
+
+def rotate_refresh_token(db: Session, token: str) -> Optional[tuple]:
+    # Старый токен гасится условным UPDATE: при параллельном обмене одного
+    # токена выиграет только один запрос.
+    token_hash = hash_refresh_token(token)
+    row = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked.is_(False),
+            RefreshToken.expires_at > datetime.now(),
+        )
+        .values(revoked=True)
+        .returning(RefreshToken.user_id)
+    ).first()
+    if row is None:
+        # Повторное использование уже обмененного токена похоже на утечку:
+        # отзываем все токены пользователя.
+        reused = db.execute(
+            select(RefreshToken.user_id).where(
+                RefreshToken.token_hash == token_hash, RefreshToken.revoked.is_(True)
+            )
+        ).first()
+        if reused is not None:
+            revoke_refresh_tokens(db, reused.user_id)
+            db.commit()
+            metrics.inc("auth.refresh_token_reused")
+        return None
+    new_token = issue_refresh_token(db, row.user_id)
+    db.commit()
+    return row.user_id, new_token
+
+
 def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
 ):
@@ -0,0 +1,103 @@
+import functools
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from . import metrics
+from .database import cache_ttl
+from .shared_cache import get_shared_cache
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            with self._lock:
+                del self._calls[key]
+        return result, False
+
+
+flights = SingleFlight()
+
+
+def freeze(value):
+    # Ключ строится из тех же значений, с которыми выполняется запрос: любая
+    # нормализация здесь смешала бы ответы на разные фильтры.
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(freeze(item) for item in value)
+    return value
+
+
+def coalesce(
+    route: str,
+    params: tuple[str, ...] = (),
+    scope: Optional[Callable[[dict], Hashable]] = None,
+    response_model=None,
+    cache: Optional[str] = None,
+):
+    # Одинаковые параллельные запросы (маршрут, параметры,
+    # область авторизации) выполняют один запрос к БД и делят один JSON.
+    # С cache готовый JSON кладется в общий для воркеров кэш узла.
+    adapter = TypeAdapter(response_model) if response_model is not None else None
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            # Чтения с основной базы (липкий пользователь после записи) не
+            # делят полет и кэш с чтениями с отстающей реплики.
+            db = kwargs.get("db")
+            key = (
+                route,
+                tuple(freeze(kwargs[name]) for name in params),
+                scope(kwargs) if scope else None,
+                bool(db is not None and db.info.get("replica")),
+            )
+
+            def execute() -> bytes:
+                result = func(**kwargs)
+                if adapter is not None:
+                    return adapter.dump_json(
+                        adapter.validate_python(result, from_attributes=True)
+                    )
+                return json.dumps(jsonable_encoder(result)).encode()
+
+            def load() -> bytes:
+                body, shared = flights.do(key, execute)
+                metrics.inc(f"coalesce.{route}.{'coalesced' if shared else 'executed'}")
+                return body
+
+            shared_cache = get_shared_cache() if cache else None
+            if shared_cache is not None:
+                ttl = cache_ttl(db) if db is not None else None
+                body = shared_cache.get_or_set(cache, repr(key), load, ttl)
+            else:
+                body = load()
+            return Response(content=body, media_type="application/json")
+
+        return wrapper
+
+    return decorator
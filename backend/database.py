@@ -1,20 +1,357 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from math import ceil
+from time import monotonic, time
+from typing import Optional
 
-from .settings import project_settings
+from fastapi import Depends, Request
+from jose import JWTError, jwt
+from sqlalchemy import any_, create_engine, event, literal, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from .deadline import (
+    apply_deadline,
+    current_cancellation,
+    raise_if_cancelled,
+    release_deadline,
+    request_deadline,
+)
+from .settings import get_project_settings
 from .models import Base
 
-engine = create_engine(project_settings.POSTGRES_CONN)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False)
+ReplicaSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False
+)
+
+SCHEMA_LOCK_KEY = 6105
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+memory_keepers: list[sqlite3.Connection] = []
+
+
+def build_sqlite_engine(url: URL) -> Engine:
+    if url.database in (None, "", ":memory:"):
+        # Именованная база в памяти с общим кэшем: у каждой сессии свое
+        # соединение и своя транзакция.
+        settings = get_project_settings()
+        database = f"file:tender-{uuid.uuid4().hex}?mode=memory&cache=shared"
+        url = url.set(database=database, query={"uri": "true"})
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            poolclass=QueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+        )
+        # База существует, пока открыто хоть одно соединение: это держит ее
+        # до конца процесса, даже если пул закроет свои.
+        memory_keepers.append(sqlite3.connect(database, uri=True))
+    else:
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+def build_engine(url: str) -> Engine:
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return build_sqlite_engine(url)
+    settings = get_project_settings()
+    return create_engine(
+        url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+    )
+
+
+def database_url() -> str:
+    settings = get_project_settings()
+    if settings.DB_BACKEND == "sqlite":
+        return f"sqlite:///{settings.SQLITE_PATH}"
+    if not settings.POSTGRES_CONN:
+        raise RuntimeError("POSTGRES_CONN is required when DB_BACKEND=postgres")
+    return settings.POSTGRES_CONN
+
+
+@lru_cache
+def get_engine() -> Engine:
+    return build_engine(database_url())
+
+
+REPLICA_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery()"
+    " OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+    " END"
+)
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        replica: Optional[Engine],
+        sticky_seconds: float,
+        max_lag_seconds: float,
+        check_interval_seconds: float,
+    ):
+        self.replica = replica
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self._lock = threading.Lock()
+        self._last_write: dict[str, float] = {}
+        self._checked_at = float("-inf")
+        self._healthy = False
+
+    def mark_write(self, key: str):
+        now = monotonic()
+        with self._lock:
+            if len(self._last_write) > 10_000:
+                self._last_write = {
+                    k: t
+                    for k, t in self._last_write.items()
+                    if now - t < self.sticky_seconds
+                }
+            self._last_write[key] = now
+
+    def is_sticky(self, key: str) -> bool:
+        written_at = self._last_write.get(key)
+        return written_at is not None and monotonic() - written_at < self.sticky_seconds
+
+    def mark_unhealthy(self):
+        self._healthy = False
+        self._checked_at = monotonic()
+
+    def replica_available(self) -> bool:
+        if self.replica is None:
+            return False
+        now = monotonic()
+        if now - self._checked_at >= self.check_interval_seconds:
+            self._checked_at = now
+            self._healthy = self._check_lag()
+        return self._healthy
+
+    def use_replica(self, key: str, last_write: Optional[float] = None) -> bool:
+        # last_write приходит от клиента в cookie и действует во всех воркерах;
+        # словарь в памяти прикрывает клиентов, которые cookie не хранят.
+        if last_write is not None and 0 <= time() - last_write < self.sticky_seconds:
+            return False
+        return not self.is_sticky(key) and self.replica_available()
+
+    def _check_lag(self) -> bool:
+        try:
+            with self.replica.connect() as conn:
+                lag = conn.execute(REPLICA_LAG_SQL).scalar()
+        except DBAPIError:
+            return False
+        return lag is not None and float(lag) <= self.max_lag_seconds
+
+
+@lru_cache
+def get_replica_router() -> ReplicaRouter:
+    settings = get_project_settings()
+    replica = (
+        build_engine(settings.POSTGRES_REPLICA_CONN)
+        if settings.POSTGRES_REPLICA_CONN
+        else None
+    )
+    return ReplicaRouter(
+        replica,
+        settings.REPLICA_STICKY_SECONDS,
+        settings.REPLICA_MAX_LAG_SECONDS,
+        settings.REPLICA_CHECK_INTERVAL_SECONDS,
+    )
+
+
+LAST_WRITE_COOKIE = "last_write"
+
+
+def sticky_key(request: Request) -> str:
+    # Подпись токена проверяет get_current_user; здесь subject только выбирает
+    # сервер, поэтому все токены одного пользователя дают один ключ.
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            subject = jwt.get_unverified_claims(token).get("sub")
+        except JWTError:
+            subject = None
+        if subject:
+            return f"user:{subject}"
+    return request.client.host if request.client else ""
+
+
+def last_write(request: Request) -> Optional[float]:
+    try:
+        return float(request.cookies[LAST_WRITE_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def remember_write(session):
+    key = session.info.get("sticky_key")
+    router = get_replica_router()
+    if key is not None and router.replica is not None:
+        router.mark_write(key)
+        state = session.info.get("request_state")
+        if state is not None:
+            state.last_write = time()
+
+
+class LastWriteCookieMiddleware:
+    # Отдает клиенту время последней записи: следующий запрос чтения пойдет на
+    # основную базу, в какой бы воркер он ни попал.
+    def __init__(self, app, max_age: float):
+        self.app = app
+        self.max_age = max_age
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            written_at = scope.get("state", {}).get("last_write")
+            if message["type"] == "http.response.start" and written_at is not None:
+                cookie = (
+                    f"{LAST_WRITE_COOKIE}={written_at:.3f}; Max-Age={ceil(self.max_age)};"
+                    " Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode()),
+                ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
 
 
-def get_db():
-    db = SessionLocal()
+for session_factory in (SessionLocal, ReplicaSessionLocal):
+    event.listen(session_factory, "after_begin", apply_deadline)
+    event.listen(session_factory, "after_transaction_end", release_deadline)
+
+
+def session_info(request: Request) -> dict:
+    return {
+        "sticky_key": sticky_key(request),
+        "deadline": request_deadline(request),
+        "cancellation": current_cancellation.get(),
+        "request_state": request.state,
+    }
+
+
+def get_db(request: Request):
+    db = SessionLocal(bind=get_engine(), info=session_info(request))
     try:
         yield db
+    except DBAPIError as exc:
+        raise_if_cancelled(db, exc)
+        raise
     finally:
         db.close()
 
 
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    # Без реплики отдаем ту же сессию, что получил get_current_user: запрос
+    # не берет из пула второе соединение.
+    replica_router = get_replica_router()
+    if not replica_router.use_replica(sticky_key(request), last_write(request)):
+        yield db
+        return
+    replica_db = ReplicaSessionLocal(
+        bind=replica_router.replica, info={**session_info(request), "replica": True}
+    )
+    try:
+        replica_db.connection()
+    except OperationalError:
+        replica_db.close()
+        replica_router.mark_unhealthy()
+        yield db
+        return
+    try:
+        yield replica_db
+    except DBAPIError as exc:
+        raise_if_cancelled(replica_db, exc)
+        if isinstance(exc, OperationalError):
+            replica_router.mark_unhealthy()
+        raise
+    finally:
+        replica_db.close()
+
+
+def cache_ttl(db: Session) -> Optional[float]:
+    # Реплика отстает не больше допустимого лага: прочитанное с нее можно
+    # кэшировать не дольше, иначе смена поколения не спасет от старых данных.
+    if db.info.get("replica"):
+        return get_project_settings().REPLICA_MAX_LAG_SECONDS
+    return None
+
+
+def dialect_insert(db: Session, model):
+    # INSERT с поддержкой ON CONFLICT для текущего диалекта.
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+def id_in(db: Session, column, values: list):
+    # В PostgreSQL список передается одним массивом (= ANY), и план запроса
+    # не зависит от числа идентификаторов.
+    if db.get_bind().dialect.name == "postgresql":
+        return column == any_(literal(values, postgresql.ARRAY(column.type)))
+    return column.in_(values)
+
+
 def create_tables():
-    Base.metadata.create_all(bind=engine)
+    # Воркеры стартуют одновременно: проверка схемы выполняется по очереди.
+    with get_engine().begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(
+                text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY}
+            )
+        Base.metadata.create_all(bind=conn)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+
+def warm_up_pool(size: int):
+    engine = get_engine()
+    size = min(size, get_project_settings().DB_POOL_SIZE)
+    if size <= 0:
+        return
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        connections = list(executor.map(lambda _: engine.connect(), range(size)))
+    for conn in connections:
+        conn.close()
+
+
+def dispose_engine():
+    get_engine().dispose()
+
+
+def check_database() -> bool:
+    try:
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except DBAPIError:
+        return False
+    return True
@@ -0,0 +1,187 @@
+import asyncio
+import math
+import threading
+from contextvars import ContextVar
+from time import monotonic
+from typing import Optional
+
+from fastapi import HTTPException, Request
+from sqlalchemy.exc import DBAPIError
+
+from . import metrics
+from .settings import get_project_settings
+
+QUERY_CANCELED = "57014"
+
+
+class RequestCancellation:
+    # Соединения с БД, на которых сейчас идут транзакции запроса. Блокировка
+    # не дает отменить соединение, уже вернувшееся в пул к другому запросу.
+    def __init__(self):
+        self.started_at = monotonic()
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._connections: dict[int, object] = {}
+
+    def attach(self, session_id: int, dbapi_connection):
+        with self._lock:
+            if self.cancelled:
+                cancel_connection(dbapi_connection)
+            self._connections[session_id] = dbapi_connection
+
+    def detach(self, session_id: int):
+        with self._lock:
+            self._connections.pop(session_id, None)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            for dbapi_connection in self._connections.values():
+                cancel_connection(dbapi_connection)
+
+
+current_cancellation: ContextVar[Optional[RequestCancellation]] = ContextVar(
+    "current_cancellation", default=None
+)
+
+
+def cancel_connection(dbapi_connection):
+    # psycopg2 отправляет серверу cancel request, sqlite3 прерывает запрос.
+    cancel = getattr(dbapi_connection, "cancel", None) or dbapi_connection.interrupt
+    cancel()
+
+
+def request_deadline(request: Request) -> Optional[float]:
+    settings = get_project_settings()
+    route = request.scope.get("route")
+    path = route.path if route is not None else request.url.path
+    budget = settings.ROUTE_DEADLINE_SECONDS.get(
+        path, settings.REQUEST_DEADLINE_SECONDS
+    )
+    header = request.headers.get("x-request-timeout")
+    if header is not None:
+        # Заголовок может только задать конечный срок: отключить его (0 в
+        # ROUTE_DEADLINE_SECONDS) можно лишь настройкой маршрута.
+        try:
+            timeout = float(header)
+        except ValueError:
+            timeout = math.nan
+        if not math.isfinite(timeout) or timeout <= 0:
+            raise HTTPException(status_code=400, detail="Invalid X-Request-Timeout")
+        budget = min(timeout, settings.MAX_REQUEST_DEADLINE_SECONDS)
+    if budget <= 0:
+        return None
+    cancellation = current_cancellation.get()
+    started_at = cancellation.started_at if cancellation else monotonic()
+    return started_at + budget
+
+
+def deadline_exceeded() -> HTTPException:
+    metrics.inc("deadline.exceeded")
+    return HTTPException(status_code=504, detail="Request deadline exceeded")
+
+
+def apply_deadline(session, transaction, connection):
+    # Срок пересчитывается в начале каждой транзакции сессии: SET LOCAL
+    # действует только до COMMIT.
+    dbapi_connection = connection.connection.dbapi_connection
+    cancellation = session.info.get("cancellation")
+    if cancellation is not None:
+        cancellation.attach(id(session), dbapi_connection)
+    deadline = session.info.get("deadline")
+    if deadline is None:
+        return
+    remaining = deadline - monotonic()
+    if remaining <= 0:
+        raise deadline_exceeded()
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql(
+            f"SET LOCAL statement_timeout = {max(1, int(remaining * 1000))}"
+        )
+    elif connection.dialect.name == "sqlite":
+        # В SQLite нет statement_timeout: запрос прерывает progress handler.
+        dbapi_connection.set_progress_handler(lambda: monotonic() > deadline, 10_000)
+        session.info["progress_connection"] = dbapi_connection
+
+
+def release_deadline(session, transaction):
+    if transaction.parent is not None:
+        return
+    cancellation = session.info.get("cancellation")
+    if cancellation is not None:
+        cancellation.detach(id(session))
+    dbapi_connection = session.info.pop("progress_connection", None)
+    if dbapi_connection is not None:
+        dbapi_connection.set_progress_handler(None, 0)
+
+
+def raise_if_cancelled(session, exc: DBAPIError):
+    orig = exc.orig
+    if getattr(orig, "pgcode", None) != QUERY_CANCELED and str(orig) != "interrupted":
+        return
+    cancellation = session.info.get("cancellation")
+    if cancellation is not None and cancellation.cancelled:
+        metrics.inc("requests.cancelled")
+        raise HTTPException(status_code=499, detail="Client closed request") from exc
+    raise deadline_exceeded() from exc
+
+
+class CancelOnDisconnectMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cancellation = RequestCancellation()
+        disconnected = asyncio.Event()
+        watcher = None
+        headers = dict(scope["headers"])
+        # Запрос без тела: отключение слушаем сразу, приложению отдаем пустое тело.
+        body_done = (
+            headers.get(b"content-length", b"0") == b"0"
+            and b"transfer-encoding" not in headers
+        )
+        body_sent = False
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+            cancellation.cancel()
+
+        def start_watching():
+            nonlocal watcher
+            if watcher is None:
+                watcher = asyncio.create_task(watch_disconnect())
+
+        async def app_receive():
+            # Тело не буферизуется: приложение читает его само, а слушать
+            # отключение начинаем, только когда оно прочитано целиком.
+            nonlocal body_done, body_sent
+            if not body_done:
+                message = await receive()
+                if message["type"] == "http.disconnect" or not message.get(
+                    "more_body", False
+                ):
+                    body_done = True
+                    body_sent = True
+                    start_watching()
+                return message
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        if body_done:
+            start_watching()
+        context_token = current_cancellation.set(cancellation)
+        try:
+            await self.app(scope, app_receive, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            current_cancellation.reset(context_token)
@@ -1,21 +1,62 @@
+import json
+import uuid
+from typing import Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 
-from .database import get_db
+from .database import cache_ttl, get_db, get_read_db
 from .models import Employee
 from .schemas import TokenData
-from .settings import project_settings
+from .settings import get_project_settings
+from .shared_cache import get_shared_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/token")
 
 ALGORITHM = "HS256"
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-):
+def decode_token(token: str) -> TokenData:
+    payload = jwt.decode(
+        token, get_project_settings().SECRET_KEY, algorithms=[ALGORITHM]
+    )
+    user_id: str = payload.get("sub")
+    if user_id is None:
+        raise JWTError("Token has no subject")
+    return TokenData(id=user_id)
+
+
+EMPLOYEE_CACHE_COLUMNS = (
+    Employee.id,
+    Employee.username,
+    Employee.first_name,
+    Employee.last_name,
+    Employee.organization_id,
+)
+
+
+def employee_to_json(db: Session, user_id) -> bytes:
+    # Хэш пароля в общий кэш не попадает.
+    row = db.execute(
+        select(*EMPLOYEE_CACHE_COLUMNS).where(Employee.id == user_id)
+    ).first()
+    return json.dumps(row._asdict() if row else None, default=str).encode()
+
+
+def employee_from_json(raw: bytes) -> Optional[Employee]:
+    data = json.loads(raw)
+    if data is None:
+        return None
+    data["id"] = uuid.UUID(data["id"])
+    if data["organization_id"] is not None:
+        data["organization_id"] = uuid.UUID(data["organization_id"])
+    return Employee(**data)
+
+
+def authenticate(token: str, db: Session) -> Employee:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -23,15 +64,36 @@ def get_current_user(
     )
 
     try:
-        payload = jwt.decode(token, project_settings.SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        token_data = TokenData(id=user_id)
+        token_data = decode_token(token)
     except JWTError:
         raise credentials_exception
 
-    user = db.query(Employee).filter(Employee.id == token_data.id).first()
+    cache = get_shared_cache()
+    if cache is None:
+        user = db.query(Employee).filter(Employee.id == token_data.id).first()
+    else:
+        user = employee_from_json(
+            cache.get_or_set(
+                "directory",
+                f"employee:{token_data.id}",
+                lambda: employee_to_json(db, token_data.id),
+                cache_ttl(db),
+            )
+        )
     if user is None:
         raise credentials_exception
     return user
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+):
+    return authenticate(token, db)
+
+
+def get_current_reader(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)
+):
+    # Для эндпоинтов чтения: сотрудник читается той же сессией, что и данные,
+    # и запрос держит одно соединение.
+    return authenticate(token, db)
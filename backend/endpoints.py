@@ -1,31 +1,404 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    Header,
+    Request,
+    Response,
+)
+from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import (
+    and_,
+    cast,
+    column,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+    update,
+    values,
+)
+from sqlalchemy.exc import IntegrityError, OperationalError
 from sqlalchemy.orm import Session
 from typing import List, Annotated, Optional
-from datetime import timedelta
-from .models import Tender, Bid, OrganizationResponsible, Employee, BidReview
+import base64
+import hmac
+import json
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from .models import (
+    Tender,
+    Bid,
+    OrganizationResponsible,
+    Employee,
+    BidReview,
+    ArchivedTender,
+)
 from .schemas import (
     TenderCreate,
     TenderResponse,
     BidCreate,
     BidResponse,
+    BidPage,
     BidStatus,
     TenderStatus,
     BidReviewResponse,
     BidReviewCreate,
+    BidReviewBulkCreate,
+    BidReviewBulkResponse,
+    BatchRequest,
+    TenderBatchResponse,
+    BidBatchResponse,
+    Roster,
+    RosterResponse,
 )
 
-from .database import get_db
-from .dependencies import get_current_user
+from . import metrics
+from .analytics import (
+    cached,
+    invalidate_prices,
+    organization_key,
+    organization_price_analytics,
+    tender_key,
+    tender_price_analytics,
+)
+from .audit import get_audit_log
+from .coalesce import coalesce
+from .database import get_db, get_read_db, check_database, dialect_insert, id_in
+from .dependencies import get_current_reader, get_current_user
+from .profiler import ProfiledRoute
+from .provisioning import UsernameConflict, provision_organization
+from .settings import get_project_settings
+from .shared_cache import invalidate
 from .auth import (
     create_access_token,
     authenticate_user,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     get_password_hash,
+    issue_refresh_token,
+    revoke_refresh_tokens,
+    rotate_refresh_token,
+)
+from .schemas import RefreshTokenRequest, Token
+
+router = APIRouter(prefix="/api", tags=["API"], route_class=ProfiledRoute)
+
+LOCK_NOT_AVAILABLE = "55P03"
+
+HEALTH_PATHS = {"/api/ping", "/api/live", "/api/ready", "/api/metrics"}
+
+TENDER_LIST_COLUMNS = (
+    Tender.id,
+    Tender.title,
+    Tender.serviceType,
+    Tender.status,
+    Tender.version,
+    Tender.organization_id,
+    Tender.created_at,
 )
-from .schemas import Token
 
-router = APIRouter(prefix="/api", tags=["API"])
+TENDER_COLUMNS = (
+    *TENDER_LIST_COLUMNS,
+    Tender.description,
+    Tender.responsible_user_id,
+    Tender.updated_at,
+)
+
+BID_REVIEW_RESPONSE_COLUMNS = (
+    BidReview.id,
+    BidReview.bid_id,
+    BidReview.reviewer_id,
+    BidReview.review,
+    BidReview.status,
+)
+
+BID_RESPONSE_COLUMNS = (
+    Bid.id,
+    Bid.tender_id,
+    Bid.price,
+    Bid.description,
+    Bid.author_id,
+    Bid.status,
+    Bid.created_at,
+    Bid.updated_at,
+    Bid.version,
+)
+
+
+BID_LIST_COLUMNS = (
+    Bid.id,
+    Bid.tender_id,
+    Bid.status,
+    Bid.price,
+    Bid.created_at,
+)
+
+
+def enum_value(value):
+    return getattr(value, "value", value)
+
+
+def encode_cursor(created_at: datetime, bid_id) -> str:
+    raw = json.dumps([created_at.isoformat(), str(bid_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        created_at, bid_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), uuid.UUID(bid_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def etag(row) -> str:
+    # Смена статуса не меняет версию, поэтому статус входит в ETag: иначе два
+    # перехода с одним If-Match оба прошли бы проверку.
+    return f'"{row.version}-{enum_value(row.status)}"'
+
+
+def if_match_state(
+    if_match: Optional[str] = Header(None),
+) -> Optional[tuple[int, Optional[str]]]:
+    if if_match is None or if_match.strip() == "*":
+        return None
+    # Без статуса ("3") проверяется только версия, как в прежних ETag.
+    version, _, expected_status = (
+        if_match.strip().removeprefix("W/").strip('"').partition("-")
+    )
+    try:
+        return int(version), expected_status or None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный заголовок If-Match.",
+        )
+
+
+def where_state(stmt, model, expected_state: Optional[tuple[int, Optional[str]]]):
+    if expected_state is None:
+        return stmt
+    version, expected_status = expected_state
+    stmt = stmt.where(model.version == version)
+    if expected_status is not None:
+        stmt = stmt.where(model.status == expected_status)
+    return stmt
+
+
+def reject_open_bids(db: Session, tender_id, except_bid_id=None):
+    # Один UPDATE по всем открытым предложениям тендера, без загрузки в ORM.
+    stmt = (
+        update(Bid)
+        .where(Bid.tender_id == tender_id, Bid.status.in_(["CREATED", "PUBLISHED"]))
+        .values(status="REJECTED")
+        .returning(Bid.id, Bid.author_id)
+        .execution_options(synchronize_session=False)
+    )
+    if except_bid_id is not None:
+        stmt = stmt.where(Bid.id != except_bid_id)
+    return db.execute(stmt).all()
+
+
+def lock_tender(db: Session, tender_id):
+    # SELECT ... FOR UPDATE с ограниченным ожиданием: при очереди на один
+    # тендер лучше быстро ответить 409, чем копить висящие запросы.
+    if db.get_bind().dialect.name == "postgresql":
+        timeout_ms = int(get_project_settings().APPROVAL_LOCK_TIMEOUT_SECONDS * 1000)
+        db.execute(text(f"SET LOCAL lock_timeout = {max(1, timeout_ms)}"))
+    try:
+        return db.execute(
+            select(Tender.status).where(Tender.id == tender_id).with_for_update()
+        ).one()
+    except OperationalError as exc:
+        if getattr(exc.orig, "pgcode", None) != LOCK_NOT_AVAILABLE:
+            raise
+        db.rollback()
+        metrics.inc("approval.lock_timeout")
+        raise HTTPException(
+            status_code=409,
+            detail="Tender is being updated by another request, retry later",
+            headers={"Retry-After": "1"},
+        )
+
+
+def notify_rejected_authors(tender_id, actor_id, rejected):
+    # Одно уведомление на автора со списком всех его отклоненных предложений.
+    bids_by_author = defaultdict(list)
+    for bid in rejected:
+        bids_by_author[bid.author_id].append(str(bid.id))
+    audit_log = get_audit_log()
+    for author_id, bid_ids in bids_by_author.items():
+        audit_log.record(
+            "bid.auto_reject",
+            "employee",
+            author_id,
+            actor_id,
+            {"tender_id": str(tender_id), "bid_ids": bid_ids},
+        )
+    metrics.inc("bids.auto_rejected", len(rejected))
+
+
+def update_tender(
+    db: Session,
+    tender_id: str,
+    current_user: Employee,
+    expected_state: Optional[tuple[int, Optional[str]]],
+    values: dict,
+    action: str,
+):
+    stmt = (
+        update(Tender)
+        .where(Tender.id == tender_id, Tender.responsible_user_id == current_user.id)
+        .values(**values)
+        .returning(
+            Tender.id, Tender.title, Tender.description, Tender.status, Tender.version
+        )
+        .execution_options(synchronize_session=False)
+    )
+    stmt = where_state(stmt, Tender, expected_state)
+    row = db.execute(stmt).first()
+    if row is None:
+        # Строка не обновлена: выясняем причину, чтобы вернуть 404/403/409.
+        db.rollback()
+        tender = db.execute(
+            select(Tender.responsible_user_id).where(Tender.id == tender_id)
+        ).first()
+        if tender is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Тендер не найден."
+            )
+        if tender.responsible_user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Недостаточно прав для выполнения действия.",
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Тендер был изменен другим запросом, версия не совпадает.",
+        )
+    rejected = []
+    if values.get("status") == "CLOSED":
+        rejected = reject_open_bids(db, row.id)
+    db.commit()
+    invalidate("tenders")
+    get_audit_log().record(
+        f"tender.{action}",
+        "tender",
+        row.id,
+        current_user.id,
+        {"status": enum_value(row.status), "version": row.version},
+    )
+    notify_rejected_authors(row.id, current_user.id, rejected)
+    return row
+
+
+FINAL_BID_STATUSES = (BidStatus.APPROVED.value, BidStatus.REJECTED.value)
+
+
+def tender_organization(tender_id):
+    return (
+        select(Tender.organization_id)
+        .where(Tender.id == tender_id)
+        .correlate_except(Tender)
+        .scalar_subquery()
+    )
+
+
+def open_tender_ids():
+    return select(Tender.id).where(Tender.status != TenderStatus.CLOSED)
+
+
+def update_bid(
+    db: Session,
+    bid_id: str,
+    current_user: Employee,
+    expected_state: Optional[tuple[int, Optional[str]]],
+    values: dict,
+    action: str,
+    where: tuple = (),
+    returning: tuple = (),
+):
+    # После закрытия тендера его предложения не меняются: решение по тендеру
+    # и каскадное отклонение не должны откатываться правками поставщиков.
+    stmt = (
+        update(Bid)
+        .where(
+            Bid.id == bid_id,
+            or_(
+                Bid.author_id == current_user.id,
+                Bid.tender_id.in_(
+                    select(Tender.id).where(
+                        Tender.organization_id == current_user.organization_id
+                    )
+                ),
+            ),
+            Bid.tender_id.in_(open_tender_ids()),
+            Bid.status.not_in(FINAL_BID_STATUSES),
+            *where,
+        )
+        .values(**values)
+        .returning(*BID_RESPONSE_COLUMNS, *returning)
+        .execution_options(synchronize_session=False)
+    )
+    if "tender_id" in values:
+        stmt = stmt.where(
+            literal(values["tender_id"], Tender.id.type).in_(open_tender_ids())
+        )
+    stmt = where_state(stmt, Bid, expected_state)
+    row = db.execute(stmt).first()
+    if row is None:
+        # Строка не обновлена: выясняем причину, чтобы вернуть 404/403/409.
+        db.rollback()
+        bid = db.execute(
+            select(
+                Bid.author_id,
+                Bid.status,
+                Tender.organization_id,
+                Tender.status.label("tender_status"),
+            )
+            .outerjoin(Tender, Bid.tender_id == Tender.id)
+            .where(Bid.id == bid_id)
+        ).first()
+        if bid is None:
+            raise HTTPException(status_code=404, detail="Bid not found")
+        if (
+            current_user.id != bid.author_id
+            and current_user.organization_id != bid.organization_id
+        ):
+            raise HTTPException(
+                status_code=403, detail=f"You are not allowed to {action} this bid"
+            )
+        if enum_value(bid.tender_status) == TenderStatus.CLOSED.value:
+            raise HTTPException(status_code=409, detail="Tender is already closed")
+        if enum_value(bid.status) in FINAL_BID_STATUSES:
+            raise HTTPException(
+                status_code=409, detail=f"Bid is already {enum_value(bid.status)}"
+            )
+        if "tender_id" in values:
+            target = db.execute(
+                select(Tender.status).where(Tender.id == values["tender_id"])
+            ).first()
+            if target is None:
+                raise HTTPException(status_code=404, detail="Tender not found")
+            if enum_value(target.status) == TenderStatus.CLOSED.value:
+                raise HTTPException(status_code=409, detail="Tender is already closed")
+        raise HTTPException(
+            status_code=409, detail="Bid was modified concurrently, version mismatch"
+        )
+    db.commit()
+    get_audit_log().record(
+        f"bid.{action}",
+        "bid",
+        row.id,
+        current_user.id,
+        {"status": enum_value(row.status), "version": row.version},
+    )
+    return row
 
 
 @router.post("/register_user")
@@ -33,10 +406,40 @@ def register_user(username: str, password: str, db: Session = Depends(get_db)):
     new_user = Employee(username=username, hashed_password=get_password_hash(password))
     db.add(new_user)
     db.commit()
-    db.refresh(new_user)
+    invalidate("directory")
     return new_user.id
 
 
+@router.post(
+    "/provision",
+    response_model=RosterResponse,
+    summary="Массовое подключение организации",
+    description="Создание организации, сотрудников и ответственных в одной транзакции. Требует заголовок X-Provisioning-Token.",
+)
+def provision(
+    roster: Roster,
+    provisioning_token: Optional[str] = Header(None, alias="X-Provisioning-Token"),
+    db: Session = Depends(get_db),
+):
+    settings = get_project_settings()
+    if (
+        not settings.PROVISIONING_TOKEN
+        or provisioning_token is None
+        or not hmac.compare_digest(
+            provisioning_token.encode(), settings.PROVISIONING_TOKEN.encode()
+        )
+    ):
+        raise HTTPException(status_code=403, detail="Invalid provisioning token")
+    try:
+        return provision_organization(db, roster, settings.PROVISIONING_BATCH_SIZE)
+    except UsernameConflict as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    except IntegrityError:
+        # Имя заняли параллельно между проверкой и вставкой.
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Usernames already exist")
+
+
 @router.post("/token")
 def login_for_access_token(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
@@ -49,11 +452,45 @@ def login_for_access_token(
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    refresh_token = issue_refresh_token(db, user.id)
+    db.commit()
+    return issue_token(user.id, refresh_token)
+
+
+def issue_token(user_id, refresh_token: str) -> Token:
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
+        data={"sub": str(user_id)}, expires_delta=access_token_expires
     )
-    return Token(access_token=access_token, token_type="bearer")
+    return Token(
+        access_token=access_token, token_type="bearer", refresh_token=refresh_token
+    )
+
+
+@router.post("/token/refresh")
+def refresh_access_token(
+    request: RefreshTokenRequest, db: Session = Depends(get_db)
+) -> Token:
+    # Обмен без проверки пароля: SHA-256 и поиск по уникальному индексу.
+    rotated = rotate_refresh_token(db, request.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user_id, refresh_token = rotated
+    return issue_token(user_id, refresh_token)
+
+
+@router.post("/token/revoke")
+def revoke_tokens(
+    current_user: Employee = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    revoked = revoke_refresh_tokens(db, current_user.id)
+    db.commit()
+    return {"revoked": revoked}
 
 
 @router.get("/ping")
@@ -61,20 +498,80 @@ def ping():
     return "OK"
 
 
+@router.get("/live")
+async def live():
+    return "OK"
+
+
+@router.get("/ready")
+def ready(request: Request):
+    if not request.app.state.ready or not check_database():
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready", **metrics.gauges}
+
+
+@router.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
+
+
 @router.get(
     "/tenders",
     summary="Получение списка тендеров",
     description="Список тендеров с возможностью фильтрации по типу услуг.",
 )
+@coalesce(
+    "getTenders",
+    params=("service_type", "published_only", "compact"),
+    cache="tenders",
+)
 def getTenders(
     service_type: Optional[str] = Query(None, alias="serviceType"),
-    db: Session = Depends(get_db),
+    published_only: bool = Query(False, alias="publishedOnly"),
+    compact: bool = Query(False),
+    db: Session = Depends(get_read_db),
 ):
-    query = db.query(Tender).order_by(Tender.title)
+    # compact — облегченная проекция без описания, ее покрывает индекс каталога.
+    columns = TENDER_LIST_COLUMNS if compact else TENDER_COLUMNS
+    query = select(*columns).order_by(Tender.title)
     if service_type:
-        query = query.filter(Tender.serviceType == service_type)
-    tenders = query.all()
-    return tenders
+        query = query.where(Tender.serviceType == service_type)
+    if published_only:
+        query = query.where(Tender.status == TenderStatus.PUBLISHED)
+    return [dict(row) for row in db.execute(query).mappings()]
+
+
+def batch_order(ids: list, rows) -> tuple[list, list]:
+    # Ответ в порядке запроса; повторы схлопываются, ненайденные — в missing.
+    found = {row["id"]: row for row in rows}
+    ids = list(dict.fromkeys(ids))
+    return [found[id_] for id_ in ids if id_ in found], [
+        id_ for id_ in ids if id_ not in found
+    ]
+
+
+@router.post(
+    "/tenders/batch",
+    response_model=TenderBatchResponse,
+    summary="Получение тендеров по списку идентификаторов",
+    description="До 200 тендеров одним запросом. Недоступные и несуществующие тендеры возвращаются в missing.",
+)
+def getTendersBatch(
+    batch: BatchRequest,
+    current_user: Employee = Depends(get_current_reader),
+    db: Session = Depends(get_read_db),
+):
+    # Права проверяются в том же запросе: чужие неопубликованные тендеры
+    # неотличимы от несуществующих.
+    query = select(*TENDER_LIST_COLUMNS, Tender.description).where(
+        id_in(db, Tender.id, batch.ids),
+        or_(
+            Tender.status == TenderStatus.PUBLISHED,
+            Tender.organization_id == current_user.organization_id,
+        ),
+    )
+    items, missing = batch_order(batch.ids, db.execute(query).mappings())
+    return TenderBatchResponse(items=items, missing=missing)
 
 
 @router.post(
@@ -109,7 +606,8 @@ def createTender(
     )
     db.add(new_tender)
     db.commit()
-    db.refresh(new_tender)
+    invalidate("tenders")
+    get_audit_log().record("tender.create", "tender", new_tender.id, current_user.id)
     response = TenderResponse(
         success=True,
         description="Тендер успешно создан.",
@@ -126,25 +624,25 @@ def createTender(
 )
 def publish_tender(
     tender_id: str,
+    response: Response,
+    expected_state: Optional[tuple[int, Optional[str]]] = Depends(if_match_state),
     current_user: Employee = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    tender = db.query(Tender).filter_by(id=tender_id).first()
-    if not tender:
-        raise HTTPException(status_code=404, detail="Тендер не найден.")
-    if tender.responsible_user_id != current_user.id:
-        raise HTTPException(
-            status_code=403, detail="Недостаточно прав для выполнения действия."
-        )
-    tender.status = "PUBLISHED"
-    db.commit()
-    db.refresh(tender)
-    response = TenderResponse(
+    tender = update_tender(
+        db,
+        tender_id,
+        current_user,
+        expected_state,
+        {"status": "PUBLISHED"},
+        "publish",
+    )
+    response.headers["ETag"] = etag(tender)
+    return TenderResponse(
         success=True,
         description="Тендер успешно опубликован.",
         data={"id": tender.id, "created_at": tender.status},
     )
-    return response
 
 
 @router.get(
@@ -155,8 +653,9 @@ def publish_tender(
 )
 def getUserTenders(
     username: Optional[str] = Query(None),
-    current_user: Employee = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    include_archived: bool = Query(False, alias="includeArchived"),
+    current_user: Employee = Depends(get_current_reader),
+    db: Session = Depends(get_read_db),
 ):
     if username:
         user = db.query(Employee).filter_by(username=username).first()
@@ -168,12 +667,16 @@ def getUserTenders(
     else:
         user = current_user
 
-    tenders = (
-        db.query(Tender)
-        .filter_by(responsible_user_id=user.id)
-        .order_by(Tender.title)
-        .all()
+    query = select(Tender.id, Tender.title, Tender.status).where(
+        Tender.responsible_user_id == user.id
     )
+    if include_archived:
+        query = query.union_all(
+            select(
+                ArchivedTender.id, ArchivedTender.title, ArchivedTender.status
+            ).where(ArchivedTender.responsible_user_id == user.id)
+        )
+    tenders = db.execute(query.order_by("title")).all()
 
     return TenderResponse(
         success=True,
@@ -195,25 +698,20 @@ def getUserTenders(
 )
 def close_tender(
     tender_id: str,
+    response: Response,
+    expected_state: Optional[tuple[int, Optional[str]]] = Depends(if_match_state),
     current_user: Employee = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    tender = db.query(Tender).filter_by(id=tender_id).first()
-    if not tender:
-        raise HTTPException(status_code=404, detail="Тендер не найден.")
-    if tender.responsible_user_id != current_user.id:
-        raise HTTPException(
-            status_code=403, detail="Недостаточно прав для выполнения действия."
-        )
-    tender.status = "CLOSED"
-    db.commit()
-    db.refresh(tender)
-    response = TenderResponse(
+    tender = update_tender(
+        db, tender_id, current_user, expected_state, {"status": "CLOSED"}, "close"
+    )
+    response.headers["ETag"] = etag(tender)
+    return TenderResponse(
         success=True,
         description="Тендер успешно закрыт.",
         data={"id": tender.id, "created_at": tender.status},
     )
-    return response
 
 
 @router.patch(
@@ -225,6 +723,8 @@ def close_tender(
 def editTender(
     tender_id: str,
     tender_data: TenderCreate,
+    response: Response,
+    expected_state: Optional[tuple[int, Optional[str]]] = Depends(if_match_state),
     current_user: Employee = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
@@ -234,29 +734,25 @@ def editTender(
             detail="Пользователь не существует или некорректен.",
         )
 
-    tender = db.query(Tender).filter_by(id=tender_id).first()
-    if not tender:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Тендер не найден."
-        )
-
-    if tender.responsible_user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Недостаточно прав для выполнения действия.",
-        )
-
     if not tender_data.title or not tender_data.description:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Данные неправильно сформированы или не соответствуют требованиям.",
         )
 
-    tender.title = tender_data.title
-    tender.description = tender_data.description
-    tender.version += 1
-    db.commit()
-    db.refresh(tender)
+    tender = update_tender(
+        db,
+        tender_id,
+        current_user,
+        expected_state,
+        {
+            "title": tender_data.title,
+            "description": tender_data.description,
+            "version": Tender.version + 1,
+        },
+        "edit",
+    )
+    response.headers["ETag"] = etag(tender)
 
     return TenderResponse(
         success=True,
@@ -302,7 +798,11 @@ def rollback_tender(
 
     tender.version = version
     db.commit()
+    invalidate("tenders")
     db.refresh(tender)
+    get_audit_log().record(
+        "tender.rollback", "tender", tender.id, current_user.id, {"version": version}
+    )
 
     return TenderResponse(
         success=True,
@@ -322,9 +822,17 @@ def create_bid(
     current_user: Employee = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    tender = db.query(Tender).filter_by(id=bid.tender_id).first()
+    # FOR SHARE: закрытие тендера ждет эту транзакцию или она видит CLOSED,
+    # поэтому каскадное отклонение не пропустит новое предложение.
+    tender = db.execute(
+        select(Tender.id, Tender.organization_id, Tender.status)
+        .where(Tender.id == bid.tender_id)
+        .with_for_update(read=True)
+    ).first()
     if not tender:
         raise HTTPException(status_code=404, detail="Tender not found")
+    if enum_value(tender.status) == TenderStatus.CLOSED.value:
+        raise HTTPException(status_code=409, detail="Tender is already closed")
 
     responsible = (
         db.query(OrganizationResponsible)
@@ -349,79 +857,172 @@ def create_bid(
     )
     db.add(new_bid)
     db.commit()
-    db.refresh(new_bid)
+    invalidate_prices(tender.id, tender.organization_id)
+    get_audit_log().record("bid.create", "bid", new_bid.id, current_user.id)
 
     return new_bid
 
 
+@router.post(
+    "/bids/batch",
+    response_model=BidBatchResponse,
+    summary="Получение предложений по списку идентификаторов",
+    description="До 200 предложений одним запросом. Недоступные и несуществующие предложения возвращаются в missing.",
+)
+def getBidsBatch(
+    batch: BatchRequest,
+    current_user: Employee = Depends(get_current_reader),
+    db: Session = Depends(get_read_db),
+):
+    # Видны свои предложения и предложения на тендеры своей организации.
+    query = (
+        select(*BID_RESPONSE_COLUMNS)
+        .join(Tender, Bid.tender_id == Tender.id)
+        .where(
+            id_in(db, Bid.id, batch.ids),
+            or_(
+                Bid.author_id == current_user.id,
+                Tender.organization_id == current_user.organization_id,
+            ),
+        )
+    )
+    items, missing = batch_order(batch.ids, db.execute(query).mappings())
+    return BidBatchResponse(
+        items=[{**item, "status": enum_value(item["status"])} for item in items],
+        missing=missing,
+    )
+
+
+@router.get(
+    "/bids/my",
+    response_model=BidPage,
+    summary="Получение списка ваших предложений",
+    description="Предложения текущего пользователя от новых к старым с курсорной пагинацией.",
+)
+def getUserBids(
+    limit: int = Query(5, ge=1, le=50),
+    cursor: Optional[str] = Query(None),
+    bid_status: Optional[BidStatus] = Query(None, alias="status"),
+    include_tender: bool = Query(False, alias="includeTender"),
+    current_user: Employee = Depends(get_current_reader),
+    db: Session = Depends(get_read_db),
+):
+    # Порядок совпадает с индексом ix_bid_author_created (author_id, created_at DESC, id).
+    query = (
+        select(*BID_LIST_COLUMNS)
+        .where(Bid.author_id == current_user.id)
+        .order_by(Bid.created_at.desc(), Bid.id)
+        .limit(limit + 1)
+    )
+    if cursor:
+        created_at, bid_id = decode_cursor(cursor)
+        query = query.where(
+            or_(
+                Bid.created_at < created_at,
+                and_(Bid.created_at == created_at, Bid.id > bid_id),
+            )
+        )
+    if bid_status is not None:
+        query = query.where(Bid.status == bid_status.value)
+    if include_tender:
+        query = query.add_columns(Tender.title.label("tender_title")).join(
+            Tender, Bid.tender_id == Tender.id
+        )
+
+    rows = db.execute(query).mappings().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return BidPage(
+        items=[{**row, "status": enum_value(row["status"])} for row in rows],
+        next_cursor=next_cursor,
+    )
+
+
 @router.post("/bids/{bid_id}/publish", response_model=BidResponse)
 def publish_bid(
     bid_id: str,
+    response: Response,
+    expected_state: Optional[tuple[int, Optional[str]]] = Depends(if_match_state),
     db: Session = Depends(get_db),
     current_user: Employee = Depends(get_current_user),
 ):
-    bid = db.query(Bid).filter_by(id=bid_id).first()
-    if not bid:
-        raise HTTPException(status_code=404, detail="Bid not found")
-    if (
-        current_user.id != bid.author_id
-        and current_user.organization_id != bid.tender.organization_id
-    ):
-        raise HTTPException(
-            status_code=403, detail="You are not allowed to publish this bid"
-        )
-    bid.status = "PUBLISHED"
-    db.commit()
-    db.refresh(bid)
-    return bid
+    bid = update_bid(
+        db, bid_id, current_user, expected_state, {"status": "PUBLISHED"}, "publish"
+    )
+    response.headers["ETag"] = etag(bid)
+    return bid._asdict()
 
 
 @router.post("/bids/{bid_id}/cancel", response_model=BidResponse)
 def cancel_bid(
     bid_id: str,
+    response: Response,
+    expected_state: Optional[tuple[int, Optional[str]]] = Depends(if_match_state),
     db: Session = Depends(get_db),
     current_user: Employee = Depends(get_current_user),
 ):
-    bid = db.query(Bid).filter_by(id=bid_id).first()
-    if not bid:
-        raise HTTPException(status_code=404, detail="Bid not found")
-    if (
-        current_user.id != bid.author_id
-        and current_user.organization_id != bid.tender.organization_id
-    ):
-        raise HTTPException(
-            status_code=403, detail="You are not allowed to cancel this bid"
-        )
-    bid.status = "CANCELED"
-    db.commit()
-    db.refresh(bid)
-    return bid
+    bid = update_bid(
+        db, bid_id, current_user, expected_state, {"status": "CANCELED"}, "cancel"
+    )
+    response.headers["ETag"] = etag(bid)
+    return bid._asdict()
 
 
 @router.patch("/bids/{bid_id}/edit", response_model=BidResponse)
 def edit_bid(
     bid_id: str,
     bid_update: BidCreate,
+    response: Response,
+    expected_state: Optional[tuple[int, Optional[str]]] = Depends(if_match_state),
     db: Session = Depends(get_db),
     current_user: Employee = Depends(get_current_user),
 ):
-    bid = db.query(Bid).filter_by(id=bid_id).first()
-    if not bid:
-        raise HTTPException(status_code=404, detail="Bid not found")
-    if (
-        current_user.id != bid.author_id
-        and current_user.organization_id != bid.tender.organization_id
-    ):
-        raise HTTPException(
-            status_code=403, detail="You are not allowed to edit this bid"
+    # Предложение может переехать в другой тендер: сбрасывается аналитика
+    # и прежнего, и нового тендера.
+    if db.get_bind().dialect.name == "postgresql":
+        # Прежний тендер отдает тот же UPDATE: подзапрос во FROM блокирует
+        # строку и видит значения до изменения.
+        previous = (
+            select(Bid.id, Bid.tender_id)
+            .where(Bid.id == bid_id)
+            .with_for_update()
+            .subquery("previous")
         )
-    bid.description = bid_update.description
-    bid.price = bid_update.price
-    bid.version += 1
-    bid.tender_id = bid_update.tender_id
-    db.commit()
-    db.refresh(bid)
-    return bid
+        where = (Bid.id == previous.c.id,)
+        previous_tender_id = previous.c.tender_id
+    else:
+        # SQLite не отдает в RETURNING колонки из FROM: читаем отдельно.
+        where = ()
+        previous_tender_id = literal(
+            db.execute(select(Bid.tender_id).where(Bid.id == bid_id)).scalar(),
+            Tender.id.type,
+        )
+    bid = update_bid(
+        db,
+        bid_id,
+        current_user,
+        expected_state,
+        {
+            "description": bid_update.description,
+            "price": bid_update.price,
+            "version": Bid.version + 1,
+            "tender_id": bid_update.tender_id,
+        },
+        "edit",
+        where=where,
+        returning=(
+            previous_tender_id.label("previous_tender_id"),
+            tender_organization(Bid.tender_id).label("organization_id"),
+            tender_organization(previous_tender_id).label("previous_organization_id"),
+        ),
+    )
+    invalidate_prices(bid.tender_id, bid.organization_id)
+    if bid.previous_tender_id != bid.tender_id:
+        invalidate_prices(bid.previous_tender_id, bid.previous_organization_id)
+    response.headers["ETag"] = etag(bid)
+    return bid._asdict()
 
 
 @router.post("/bids/{bid_id}/approve", response_model=BidResponse)
@@ -430,37 +1031,87 @@ def approve_bid(
     db: Session = Depends(get_db),
     current_user: Employee = Depends(get_current_user),
 ):
-    bid = db.query(Bid).filter_by(id=bid_id).first()
+    bid = db.execute(
+        select(Bid.id, Bid.tender_id, Tender.organization_id)
+        .join(Tender, Bid.tender_id == Tender.id)
+        .where(Bid.id == bid_id)
+    ).first()
     if not bid:
         raise HTTPException(status_code=404, detail="Bid not found")
 
-    if current_user.organization_id != bid.tender.organization_id:
+    if current_user.organization_id != bid.organization_id:
         raise HTTPException(
             status_code=403,
             detail="You are not responsible for this tender's organization",
         )
 
-    reviews = db.query(BidReview).filter_by(bid_id=bid_id).all()
-    if any(review.status == BidStatus.REJECTED for review in reviews):
-        bid.status = BidStatus.REJECTED
+    # Отзывы и кворум читаются под блокировкой тендера: параллельные
+    # согласования предложений одного тендера выполняются по очереди.
+    tender = lock_tender(db, bid.tender_id)
+    if enum_value(tender.status) == TenderStatus.CLOSED.value:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Tender is already closed")
+
+    responsibles = (
+        select(func.count())
+        .select_from(OrganizationResponsible)
+        .where(OrganizationResponsible.organization_id == bid.organization_id)
+        .scalar_subquery()
+    )
+    counts = db.execute(
+        select(
+            func.count().filter(BidReview.status == BidStatus.APPROVED.value),
+            func.count().filter(BidReview.status == BidStatus.REJECTED.value),
+            responsibles,
+        ).where(BidReview.bid_id == bid.id)
+    ).one()
+    approved, rejected_reviews, responsible_count = counts
+
+    new_status = None
+    if rejected_reviews:
+        new_status = BidStatus.REJECTED.value
+    elif approved >= min(3, responsible_count):
+        new_status = BidStatus.APPROVED.value
+
+    rejected = []
+    if new_status is None:
+        row = db.execute(select(*BID_RESPONSE_COLUMNS).where(Bid.id == bid.id)).one()
     else:
-        quorum = min(
-            3,
-            len(
-                db.query(OrganizationResponsible)
-                .filter_by(organization_id=bid.tender.organization_id)
-                .all()
-            ),
+        row = db.execute(
+            update(Bid)
+            .where(Bid.id == bid.id)
+            .values(status=new_status)
+            .returning(*BID_RESPONSE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        ).one()
+    tender_closed = new_status == BidStatus.APPROVED.value
+    if tender_closed:
+        db.execute(
+            update(Tender)
+            .where(Tender.id == bid.tender_id)
+            .values(status=TenderStatus.CLOSED.value)
+            .execution_options(synchronize_session=False)
         )
-        if (
-            len([review for review in reviews if review.status == BidStatus.APPROVED])
-            >= quorum
-        ):
-            bid.status = BidStatus.APPROVED
-            bid.tender.status = TenderStatus.CLOSED
+        rejected = reject_open_bids(db, bid.tender_id, except_bid_id=bid.id)
     db.commit()
-    db.refresh(bid)
-    return bid
+    if tender_closed:
+        invalidate("tenders")
+    get_audit_log().record(
+        "bid.approve",
+        "bid",
+        row.id,
+        current_user.id,
+        {
+            "status": enum_value(row.status),
+            "tender_status": (
+                TenderStatus.CLOSED.value
+                if tender_closed
+                else enum_value(tender.status)
+            ),
+        },
+    )
+    notify_rejected_authors(bid.tender_id, current_user.id, rejected)
+    return {**row._asdict(), "status": enum_value(row.status)}
 
 
 @router.post("/bids/{bid_id}/review", response_model=BidReviewResponse)
@@ -470,40 +1121,152 @@ def add_review(
     db: Session = Depends(get_db),
     current_user: Employee = Depends(get_current_user),
 ):
-    bid = db.query(Bid).filter_by(id=bid_id).first()
-    if not bid:
-        raise HTTPException(status_code=404, detail="Bid not found")
-    if current_user.organization_id != bid.tender.organization_id:
-        raise HTTPException(
-            status_code=403, detail="You are not allowed to review this bid"
+    # Проверка прав и вставка в одном INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+    stmt = (
+        dialect_insert(db, BidReview)
+        .from_select(
+            ["id", "bid_id", "reviewer_id", "review", "status"],
+            select(
+                literal(uuid.uuid4(), BidReview.id.type),
+                Bid.id,
+                literal(current_user.id, BidReview.reviewer_id.type),
+                literal(review.review, BidReview.review.type),
+                literal(review.status, BidReview.status.type),
+            )
+            .join(Tender, Bid.tender_id == Tender.id)
+            .where(
+                Bid.id == bid_id,
+                Tender.organization_id == current_user.organization_id,
+            ),
         )
-    existing_review = (
-        db.query(BidReview)
-        .filter_by(bid_id=bid_id, reviewer_id=current_user.id)
-        .first()
+        .on_conflict_do_nothing(index_elements=["bid_id", "reviewer_id"])
+        .returning(*BID_REVIEW_RESPONSE_COLUMNS)
     )
-    if existing_review:
+    new_review = db.execute(stmt).first()
+    if new_review is None:
+        db.rollback()
+        bid = db.execute(
+            select(Tender.organization_id)
+            .join(Bid, Bid.tender_id == Tender.id)
+            .where(Bid.id == bid_id)
+        ).first()
+        if bid is None:
+            raise HTTPException(status_code=404, detail="Bid not found")
+        if current_user.organization_id != bid.organization_id:
+            raise HTTPException(
+                status_code=403, detail="You are not allowed to review this bid"
+            )
         raise HTTPException(
             status_code=400, detail="You have already reviewed this bid"
         )
-    new_review = BidReview(
-        bid_id=bid_id,
-        reviewer_id=current_user.id,
-        review=review.review,
-        status=review.status,
-    )
-    db.add(new_review)
     db.commit()
-    db.refresh(new_review)
+    get_audit_log().record(
+        "bid.review",
+        "bid",
+        new_review.bid_id,
+        current_user.id,
+        {"review_id": str(new_review.id), "status": enum_value(new_review.status)},
+    )
 
-    return new_review
+    return new_review._asdict()
+
+
+@router.post(
+    "/tenders/{tender_id}/reviews",
+    response_model=BidReviewBulkResponse,
+    summary="Пакетное рассмотрение предложений",
+    description="Решения по многим предложениям одного тендера одним запросом. Уже рассмотренные и чужие предложения пропускаются.",
+)
+def add_reviews_bulk(
+    tender_id: str,
+    payload: BidReviewBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: Employee = Depends(get_current_user),
+):
+    decisions = {}
+    for decision in payload.decisions:
+        decisions.setdefault(decision.bid_id, decision)
+
+    # Как и в add_review: проверка прав и вставка одним INSERT ... SELECT,
+    # решения передаются таблицей VALUES.
+    rows = (
+        values(
+            column("id", BidReview.id.type),
+            column("bid_id", BidReview.bid_id.type),
+            column("review", BidReview.review.type),
+            column("status", BidReview.status.type),
+            name="decisions",
+        )
+        .data(
+            [
+                (uuid.uuid4(), bid_id, decision.review, decision.status)
+                for bid_id, decision in decisions.items()
+            ]
+        )
+        .cte("decisions")
+    )
+    created = db.execute(
+        dialect_insert(db, BidReview)
+        .from_select(
+            ["id", "bid_id", "reviewer_id", "review", "status"],
+            select(
+                rows.c.id,
+                Bid.id,
+                literal(current_user.id, BidReview.reviewer_id.type),
+                rows.c.review,
+                cast(rows.c.status, BidReview.status.type),
+            )
+            .join(Bid, Bid.id == rows.c.bid_id)
+            .join(Tender, Bid.tender_id == Tender.id)
+            .where(
+                Tender.id == tender_id,
+                Tender.organization_id == current_user.organization_id,
+            ),
+        )
+        .on_conflict_do_nothing(index_elements=["bid_id", "reviewer_id"])
+        .returning(*BID_REVIEW_RESPONSE_COLUMNS)
+    ).all()
+    if not created:
+        db.rollback()
+        tender = db.execute(
+            select(Tender.organization_id).where(Tender.id == tender_id)
+        ).first()
+        if tender is None:
+            raise HTTPException(status_code=404, detail="Тендер не найден.")
+        if tender.organization_id != current_user.organization_id:
+            raise HTTPException(
+                status_code=403, detail="Недостаточно прав для выполнения действия."
+            )
+    else:
+        db.commit()
+
+    audit_log = get_audit_log()
+    for review in created:
+        audit_log.record(
+            "bid.review",
+            "bid",
+            review.bid_id,
+            current_user.id,
+            {"review_id": str(review.id), "status": enum_value(review.status)},
+        )
+    created_bids = {review.bid_id for review in created}
+    return BidReviewBulkResponse(
+        created=[review._asdict() for review in created],
+        skipped=[bid_id for bid_id in decisions if bid_id not in created_bids],
+    )
 
 
 @router.get("/bids/{bid_id}/reviews", response_model=List[BidReviewResponse])
+@coalesce(
+    "get_reviews",
+    params=("bid_id",),
+    scope=lambda kwargs: kwargs["current_user"].organization_id,
+    response_model=List[BidReviewResponse],
+)
 def get_reviews(
     bid_id: str,
-    db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+    current_user: Employee = Depends(get_current_reader),
 ):
     bid = db.query(Bid).filter_by(id=bid_id).first()
     if not bid:
@@ -542,42 +1305,109 @@ def rollback_bid(
     bid.version = version
     db.commit()
     db.refresh(bid)
+    get_audit_log().record(
+        "bid.rollback", "bid", bid.id, current_user.id, {"version": version}
+    )
     return bid
 
 
-@router.get("/bids/{tender_id}/reviews", response_model=List[BidReviewResponse])
+@router.get(
+    "/tenders/{tender_id}/reviews",
+    response_model=List[BidReviewResponse],
+    summary="Просмотр отзывов на прошлые предложения",
+    description="Отзывы на предложения автора по тендеру организации. Поддерживает limit/offset и курсор из заголовка X-Next-Cursor.",
+)
 def get_reviews_for_tender(
     tender_id: str,
-    author_username: str,
-    organization_id: str,
-    db: Session = Depends(get_db),
-    current_user: Employee = Depends(get_current_user),
+    response: Response,
+    author_username: str = Query(..., alias="authorUsername"),
+    limit: int = Query(5, ge=1, le=50),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(get_read_db),
+    current_user: Employee = Depends(get_current_reader),
 ):
-    if str(current_user.organization_id) != str(organization_id):
-        raise HTTPException(
-            status_code=403, detail="Недостаточно прав для просмотра отзывов."
+    # Один запрос: индекс bid(tender_id, author_id), затем uq_bid_reviews_bid_reviewer.
+    query = (
+        select(*BID_REVIEW_RESPONSE_COLUMNS)
+        .join(Bid, BidReview.bid_id == Bid.id)
+        .join(Employee, Bid.author_id == Employee.id)
+        .join(Tender, Bid.tender_id == Tender.id)
+        .where(
+            Bid.tender_id == tender_id,
+            Employee.username == author_username,
+            Tender.organization_id == current_user.organization_id,
         )
-
-    author = db.query(Employee).filter_by(username=author_username).first()
-    if not author:
-        raise HTTPException(status_code=404, detail="Автор не найден.")
-
-    bids = (
-        db.query(Bid)
-        .filter(Bid.author_id == author.id, Bid.tender_id == tender_id)
-        .all()
+        .order_by(BidReview.id)
+        .offset(offset)
+        .limit(limit + 1)
     )
+    if cursor:
+        try:
+            query = query.where(BidReview.id > uuid.UUID(cursor))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Некорректный курсор.")
+    reviews = db.execute(query).all()
+
+    if not reviews and not offset and not cursor:
+        tender = db.execute(
+            select(Tender.organization_id).where(Tender.id == tender_id)
+        ).first()
+        if tender is None:
+            raise HTTPException(status_code=404, detail="Тендер не найден.")
+        if tender.organization_id != current_user.organization_id:
+            raise HTTPException(
+                status_code=403, detail="Недостаточно прав для просмотра отзывов."
+            )
+        raise HTTPException(status_code=404, detail="Отзывы не найдены.")
 
-    if not bids:
-        raise HTTPException(status_code=404, detail="Предложения автора не найдены.")
+    if len(reviews) > limit:
+        reviews = reviews[:limit]
+        response.headers["X-Next-Cursor"] = str(reviews[-1].id)
+    return [review._asdict() for review in reviews]
 
-    reviews = (
-        db.query(BidReview)
-        .filter(BidReview.bid_id.in_([str(bid.id) for bid in bids]))
-        .all()
+
+@router.get(
+    "/tenders/analytics",
+    summary="Аналитика цен предложений организации",
+    description="Квантили, разброс и выбросы цен по каждому тендеру организации пользователя.",
+)
+def get_organization_price_analytics(
+    db: Session = Depends(get_read_db),
+    current_user: Employee = Depends(get_current_reader),
+):
+    if current_user.organization_id is None:
+        raise HTTPException(
+            status_code=403, detail="Пользователь не состоит в организации."
+        )
+    body = cached(
+        db,
+        organization_key(current_user.organization_id),
+        lambda: organization_price_analytics(db, current_user.organization_id),
     )
+    return Response(content=body, media_type="application/json")
 
-    if not reviews:
-        raise HTTPException(status_code=404, detail="Отзывы не найдены.")
 
-    return reviews
+@router.get(
+    "/tenders/{tender_id}/bids/analytics",
+    summary="Аналитика цен предложений по тендеру",
+    description="Квантили, z-оценки и выбросы по правилу IQR для цен всех предложений тендера.",
+)
+def get_tender_price_analytics(
+    tender_id: uuid.UUID,
+    db: Session = Depends(get_read_db),
+    current_user: Employee = Depends(get_current_reader),
+):
+    tender = db.execute(
+        select(Tender.organization_id).where(Tender.id == tender_id)
+    ).first()
+    if tender is None:
+        raise HTTPException(status_code=404, detail="Тендер не найден.")
+    if tender.organization_id != current_user.organization_id:
+        raise HTTPException(
+            status_code=403, detail="Недостаточно прав для просмотра аналитики."
+        )
+    body = cached(
+        db, tender_key(tender_id), lambda: tender_price_analytics(db, tender_id)
+    )
+    return Response(content=body, media_type="application/json")
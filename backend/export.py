@@ -0,0 +1,183 @@
+import csv
+import enum
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select
+
+from .database import get_engine, get_replica_router
+from .dependencies import get_current_user
+from .models import Bid, BidReview, Employee, Tender
+from .profiler import ProfiledRoute
+
+router = APIRouter(prefix="/api/export", tags=["Export"], route_class=ProfiledRoute)
+
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def json_default(value):
+    if isinstance(value, (uuid.UUID, datetime)):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def csv_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+def export_engine():
+    replica_router = get_replica_router()
+    if replica_router.replica_available():
+        return replica_router.replica
+    return get_engine()
+
+
+def stream_rows(query: Select, fmt: str):
+    # Серверный курсор: в памяти одновременно не больше одной пачки строк.
+    with export_engine().connect() as conn:
+        result = conn.execution_options(yield_per=EXPORT_BATCH_SIZE).execute(query)
+        columns = list(result.keys())
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue()
+        for partition in result.partitions():
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([csv_value(v) for v in row] for row in partition)
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(dict(zip(columns, row)), default=json_default) + "\n"
+                    for row in partition
+                )
+
+
+def export_response(query: Select, fmt: str, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_rows(query, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+def export_organization(
+    organization_id: Optional[uuid.UUID], current_user: Employee
+) -> uuid.UUID:
+    if organization_id is None:
+        organization_id = current_user.organization_id
+    if organization_id is None or organization_id != current_user.organization_id:
+        raise HTTPException(
+            status_code=403, detail="Недостаточно прав для выгрузки данных."
+        )
+    return organization_id
+
+
+def updated_between(query: Select, column, updated_from, updated_to) -> Select:
+    if updated_from is not None:
+        query = query.where(column >= updated_from)
+    if updated_to is not None:
+        query = query.where(column < updated_to)
+    return query
+
+
+@router.get("/tenders", summary="Выгрузка тендеров организации")
+def export_tenders(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    organization_id: Optional[uuid.UUID] = Query(None, alias="organizationId"),
+    updated_from: Optional[datetime] = Query(None, alias="updatedFrom"),
+    updated_to: Optional[datetime] = Query(None, alias="updatedTo"),
+    current_user: Employee = Depends(get_current_user),
+):
+    organization_id = export_organization(organization_id, current_user)
+    query = (
+        select(
+            Tender.id,
+            Tender.title,
+            Tender.description,
+            Tender.serviceType,
+            Tender.status,
+            Tender.version,
+            Tender.organization_id,
+            Tender.responsible_user_id,
+            Tender.created_at,
+            Tender.updated_at,
+        )
+        .where(Tender.organization_id == organization_id)
+        .order_by(Tender.updated_at, Tender.id)
+    )
+    query = updated_between(query, Tender.updated_at, updated_from, updated_to)
+    return export_response(query, fmt, "tenders")
+
+
+@router.get("/bids", summary="Выгрузка предложений на тендеры организации")
+def export_bids(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    organization_id: Optional[uuid.UUID] = Query(None, alias="organizationId"),
+    updated_from: Optional[datetime] = Query(None, alias="updatedFrom"),
+    updated_to: Optional[datetime] = Query(None, alias="updatedTo"),
+    current_user: Employee = Depends(get_current_user),
+):
+    organization_id = export_organization(organization_id, current_user)
+    query = (
+        select(
+            Bid.id,
+            Bid.tender_id,
+            Bid.author_id,
+            Bid.description,
+            Bid.price,
+            Bid.status,
+            Bid.version,
+            Bid.created_at,
+            Bid.updated_at,
+        )
+        .join(Tender, Bid.tender_id == Tender.id)
+        .where(Tender.organization_id == organization_id)
+        .order_by(Bid.updated_at, Bid.id)
+    )
+    query = updated_between(query, Bid.updated_at, updated_from, updated_to)
+    return export_response(query, fmt, "bids")
+
+
+@router.get(
+    "/reviews",
+    summary="Выгрузка отзывов на предложения",
+    description="У отзывов нет собственных меток времени, диапазон updatedFrom/updatedTo применяется к предложению.",
+)
+def export_reviews(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    organization_id: Optional[uuid.UUID] = Query(None, alias="organizationId"),
+    updated_from: Optional[datetime] = Query(None, alias="updatedFrom"),
+    updated_to: Optional[datetime] = Query(None, alias="updatedTo"),
+    current_user: Employee = Depends(get_current_user),
+):
+    organization_id = export_organization(organization_id, current_user)
+    query = (
+        select(
+            BidReview.id,
+            BidReview.bid_id,
+            BidReview.reviewer_id,
+            BidReview.review,
+            BidReview.status,
+            Bid.tender_id,
+        )
+        .join(Bid, BidReview.bid_id == Bid.id)
+        .join(Tender, Bid.tender_id == Tender.id)
+        .where(Tender.organization_id == organization_id)
+        .order_by(Bid.updated_at, BidReview.id)
+    )
+    query = updated_between(query, Bid.updated_at, updated_from, updated_to)
+    return export_response(query, fmt, "reviews")
@@ -0,0 +1,265 @@
+import asyncio
+import hashlib
+import re
+from datetime import datetime, timedelta
+from time import monotonic
+from typing import NamedTuple, Optional
+
+from jose import JWTError
+from sqlalchemy import delete, select, update
+from starlette.responses import JSONResponse, Response
+
+from . import metrics
+from .database import SessionLocal, dialect_insert, get_engine
+from .dependencies import decode_token
+from .models import IdempotencyKey
+
+IDEMPOTENT_ROUTES = (
+    re.compile(r"^/api/tenders/new$"),
+    re.compile(r"^/api/bids/new$"),
+    re.compile(r"^/api/bids/[^/]+/review$"),
+)
+
+REPLAYED_HEADERS = {"content-type", "etag"}
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: Optional[int]
+    headers: list
+    body: bytes
+
+
+class IdempotencyStore:
+    def __init__(self, ttl_seconds: float, lease_seconds: float):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.lease = timedelta(seconds=lease_seconds)
+        self._purged_at = float("-inf")
+
+    def begin(
+        self, user_id: str, key: str, request_hash: str
+    ) -> Optional[StoredResponse]:
+        # Заглушка с коротким сроком жизни служит блокировкой между воркерами.
+        # None — ключ захвачен этим запросом, иначе — уже существующая запись.
+        now = datetime.now()
+        expired = IdempotencyKey.expires_at < now
+        with SessionLocal(bind=get_engine()) as db:
+            if monotonic() - self._purged_at > 60:
+                self._purged_at = monotonic()
+                db.execute(delete(IdempotencyKey).where(expired))
+            else:
+                db.execute(
+                    delete(IdempotencyKey).where(
+                        IdempotencyKey.user_id == user_id,
+                        IdempotencyKey.key == key,
+                        expired,
+                    )
+                )
+            acquired = db.execute(
+                dialect_insert(db, IdempotencyKey)
+                .values(
+                    user_id=user_id,
+                    key=key,
+                    request_hash=request_hash,
+                    expires_at=now + self.lease,
+                )
+                .on_conflict_do_nothing(index_elements=["user_id", "key"])
+                .returning(IdempotencyKey.key)
+            ).first()
+            existing = None if acquired else self._get(db, user_id, key)
+            db.commit()
+            return existing
+
+    def _get(self, db, user_id: str, key: str) -> Optional[StoredResponse]:
+        row = db.execute(
+            select(
+                IdempotencyKey.request_hash,
+                IdempotencyKey.status_code,
+                IdempotencyKey.headers,
+                IdempotencyKey.body,
+            ).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        ).first()
+        return StoredResponse(*row) if row else None
+
+    def complete(self, user_id: str, key: str, response: StoredResponse):
+        with SessionLocal(bind=get_engine()) as db:
+            db.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+                .values(
+                    status_code=response.status_code,
+                    headers=response.headers,
+                    body=response.body,
+                    expires_at=datetime.now() + self.ttl,
+                )
+            )
+            db.commit()
+
+    def release(self, user_id: str, key: str):
+        with SessionLocal(bind=get_engine()) as db:
+            db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+                )
+            )
+            db.commit()
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app, store: IdempotencyStore, wait_seconds: float):
+        self.app = app
+        self.store = store
+        self.wait_seconds = wait_seconds
+        self._in_flight: dict[tuple[str, str], asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not any(route.match(scope["path"]) for route in IDEMPOTENT_ROUTES)
+        ):
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        key = headers.get(b"idempotency-key", b"").decode("latin-1").strip()
+        user_id = self._subject(headers)
+        if not key or user_id is None:
+            await self.app(scope, receive, send)
+            return
+        if len(key) > 255:
+            response = JSONResponse(
+                status_code=400, content={"detail": "Idempotency-Key is too long"}
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        request_hash = hashlib.sha256(scope["path"].encode() + b"\n" + body).hexdigest()
+
+        # Повторы внутри воркера ждут первый запрос, не обращаясь к БД.
+        flight_key = (user_id, key)
+        future = self._in_flight.get(flight_key)
+        if future is not None:
+            stored = await asyncio.shield(future)
+            metrics.inc("idempotency.coalesced")
+            await self._replay(stored, request_hash)(scope, receive, send)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[flight_key] = future
+        try:
+            stored = await self._execute(
+                scope, receive, send, user_id, key, body, request_hash
+            )
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()
+            raise
+        else:
+            future.set_result(stored)
+        finally:
+            del self._in_flight[flight_key]
+
+    async def _acquire(self, user_id, key, request_hash):
+        deadline = monotonic() + self.wait_seconds
+        while True:
+            stored = await asyncio.to_thread(
+                self.store.begin, user_id, key, request_hash
+            )
+            if stored is None:
+                return True, None
+            if stored.status_code is not None:
+                return False, stored
+            # Ключ захвачен другим воркером: ждем, пока он сохранит ответ.
+            if monotonic() > deadline:
+                return False, None
+            await asyncio.sleep(0.05)
+
+    async def _execute(self, scope, receive, send, user_id, key, body, request_hash):
+        acquired, stored = await self._acquire(user_id, key, request_hash)
+        if not acquired:
+            if stored is not None:
+                metrics.inc("idempotency.replayed")
+            await self._replay(stored, request_hash)(scope, receive, send)
+            return stored
+
+        response_start = {}
+        chunks = []
+
+        body_sent = False
+
+        async def receive_body():
+            # Тело уже прочитано для хэша: отдаем его приложению один раз.
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response_start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive_body, capture)
+        except BaseException:
+            await asyncio.to_thread(self.store.release, user_id, key)
+            raise
+        stored = StoredResponse(
+            request_hash,
+            response_start.get("status", 500),
+            [
+                [name.decode("latin-1"), value.decode("latin-1")]
+                for name, value in response_start.get("headers", [])
+                if name.decode("latin-1").lower() in REPLAYED_HEADERS
+            ],
+            b"".join(chunks),
+        )
+        if stored.status_code >= 500:
+            # Сбой не запоминаем: повтор с тем же ключом выполнится заново.
+            await asyncio.to_thread(self.store.release, user_id, key)
+        else:
+            await asyncio.to_thread(self.store.complete, user_id, key, stored)
+        return stored
+
+    def _replay(self, stored: Optional[StoredResponse], request_hash: str) -> Response:
+        if stored is None:
+            return JSONResponse(
+                status_code=409,
+                content={"detail": "Request with this Idempotency-Key is in progress"},
+                headers={"Retry-After": "1"},
+            )
+        if stored.request_hash != request_hash:
+            return JSONResponse(
+                status_code=422,
+                content={"detail": "Idempotency-Key was used with a different request"},
+            )
+        response = Response(
+            content=stored.body,
+            status_code=stored.status_code,
+            headers=dict(stored.headers),
+        )
+        response.headers["Idempotent-Replayed"] = "true"
+        return response
+
+    async def _read_body(self, receive) -> bytes:
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    def _subject(self, headers: dict) -> Optional[str]:
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer":
+            return None
+        try:
+            return decode_token(token).id
+        except JWTError:
+            return None
@@ -0,0 +1,19 @@
+import threading
+from collections import Counter
+
+counters: Counter = Counter()
+gauges: dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def inc(name: str, value: int = 1):
+    with _lock:
+        counters[name] += value
+
+
+def set_gauge(name: str, value: float):
+    gauges[name] = value
+
+
+def snapshot() -> dict:
+    return {"counters": dict(counters), "gauges": dict(gauges)}
@@ -1,23 +1,52 @@
 import uuid
 import enum
 from sqlalchemy import (
+    Boolean,
     Column,
     String,
     Integer,
     Text,
     Enum,
     ForeignKey,
+    Index,
     TIMESTAMP,
     func,
     Float,
+    JSON,
+    LargeBinary,
+    Table,
+    TypeDecorator,
+    Uuid,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.orm import deferred
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import functions
 
 Base = declarative_base()
 
 
+class UUID(TypeDecorator):
+    # Нативный uuid в PostgreSQL, CHAR(32) в SQLite; id из пути приходят строками.
+    impl = Uuid
+    cache_ok = True
+
+    def __init__(self, as_uuid: bool = True):
+        super().__init__(as_uuid=as_uuid)
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+@compiles(functions.now, "sqlite")
+def sqlite_now(element, compiler, **kw):
+    # Тот же формат, в котором SQLAlchemy пишет datetime, чтобы сравнения не ломались.
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
 class OrganizationType(enum.Enum):
     IE = "IE"
     LLC = "LLC"
@@ -40,6 +69,7 @@ class BidStatus(enum.Enum):
 
 class Employee(Base):
     __tablename__ = "employee"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     username = Column(String(50), unique=True, nullable=False)
@@ -56,6 +86,7 @@ class Employee(Base):
 
 class Organization(Base):
     __tablename__ = "organization"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(100), nullable=False)
@@ -78,10 +109,11 @@ class OrganizationResponsible(Base):
 
 class Tender(Base):
     __tablename__ = "tenders"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(String(100), nullable=False)
-    description = Column(String)
+    description = deferred(Column(String))
     serviceType = Column(String(100))
     version = Column(Integer, default=1)
     status = Column(Enum(TenderStatus), default=TenderStatus.CREATED)
@@ -94,8 +126,24 @@ class Tender(Base):
     bids = relationship("Bid", back_populates="tender")
 
 
+Index(
+    "ix_tenders_published_catalog",
+    Tender.title,
+    postgresql_where=Tender.status == TenderStatus.PUBLISHED,
+    postgresql_include=[
+        "id",
+        "serviceType",
+        "status",
+        "version",
+        "organization_id",
+        "created_at",
+    ],
+)
+
+
 class Bid(Base):
     __tablename__ = "bid"
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String)
@@ -112,6 +160,17 @@ class Bid(Base):
     reviews = relationship("BidReview", back_populates="bid")
 
 
+Index("ix_bid_tender_author", Bid.tender_id, Bid.author_id)
+
+Index(
+    "ix_bid_author_created",
+    Bid.author_id,
+    Bid.created_at.desc(),
+    Bid.id,
+    postgresql_include=["tender_id", "status", "price"],
+)
+
+
 class BidReview(Base):
     __tablename__ = "bid_reviews"
 
@@ -124,3 +183,83 @@ class BidReview(Base):
 
     bid = relationship("Bid", back_populates="reviews")
     reviewer = relationship("Employee", back_populates="bid_reviews")
+
+
+Index(
+    "uq_bid_reviews_bid_reviewer",
+    BidReview.bid_id,
+    BidReview.reviewer_id,
+    unique=True,
+)
+
+
+class AuditEvent(Base):
+    __tablename__ = "audit_log"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    action = Column(String(50), nullable=False)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    actor_id = Column(UUID(as_uuid=True))
+    details = Column(JSON)
+    created_at = Column(TIMESTAMP, nullable=False)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(String(64), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer)
+    headers = Column(JSON)
+    body = Column(LargeBinary)
+    expires_at = Column(TIMESTAMP, nullable=False, index=True)
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Хранится только SHA-256 токена: поиск идет по уникальному индексу.
+    token_hash = Column(String(64), nullable=False, unique=True)
+    user_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("employee.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    revoked = Column(Boolean, nullable=False, default=False)
+    expires_at = Column(TIMESTAMP, nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+
+def archive_table(table: Table, *indexes: str) -> Table:
+    return Table(
+        f"{table.name}_archive",
+        Base.metadata,
+        *[
+            Column(
+                column.name,
+                column.type,
+                primary_key=column.primary_key,
+                nullable=column.nullable,
+                index=column.name in indexes,
+            )
+            for column in table.columns
+        ],
+    )
+
+
+class ArchivedTender(Base):
+    __table__ = archive_table(
+        Tender.__table__, "organization_id", "responsible_user_id"
+    )
+
+
+class ArchivedBid(Base):
+    __table__ = archive_table(Bid.__table__, "tender_id", "author_id")
+
+
+class ArchivedBidReview(Base):
+    __table__ = archive_table(BidReview.__table__, "bid_id")
@@ -0,0 +1,204 @@
+import asyncio
+import functools
+import hmac
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Optional
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+class RequestProfile:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.threads: set[int] = set()
+        self.db_calls: dict[int, tuple[str, float]] = {}
+        self.db_seconds = 0.0
+        self.db_statements = 0
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+
+    def attach(self, call, kwargs):
+        thread_id = threading.get_ident()
+        self.threads.add(thread_id)
+        try:
+            return call(**kwargs)
+        finally:
+            self.threads.discard(thread_id)
+
+    async def attach_async(self, call, kwargs):
+        thread_id = threading.get_ident()
+        self.threads.add(thread_id)
+        try:
+            return await call(**kwargs)
+        finally:
+            self.threads.discard(thread_id)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self.threads):
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    module = frame.f_globals.get("__name__", "?")
+                    stack.append(f"{module}:{frame.f_code.co_qualname}")
+                    frame = frame.f_back
+                stack.reverse()
+                # Поток ждет ответа БД: добавляем синтетический кадр с типом запроса.
+                db_call = self.db_calls.get(thread_id)
+                if db_call is not None:
+                    stack.append(f"[db] {db_call[0]}")
+                self.samples[";".join(stack)] += 1
+
+    def write(self, path: str):
+        # Формат collapsed stacks: подходит для flamegraph.pl и speedscope.
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is not None:
+        verb = statement.split(None, 1)[0].upper() if statement else "?"
+        profile.db_calls[threading.get_ident()] = (verb, perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = current_profile.get()
+    if profile is not None:
+        db_call = profile.db_calls.pop(threading.get_ident(), None)
+        if db_call is not None:
+            profile.db_seconds += perf_counter() - db_call[1]
+            profile.db_statements += 1
+
+
+def install_db_hooks():
+    if not event.contains(Engine, "before_cursor_execute", before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", after_cursor_execute)
+
+
+class ProfiledRoute(APIRoute):
+    # Регистрирует поток, в котором выполняется обработчик, в активном профиле.
+    def get_route_handler(self):
+        call = self.dependant.call
+        if asyncio.iscoroutinefunction(call):
+
+            @functools.wraps(call)
+            async def profiled(**kwargs):
+                profile = current_profile.get()
+                if profile is None:
+                    return await call(**kwargs)
+                return await profile.attach_async(call, kwargs)
+
+        else:
+
+            @functools.wraps(call)
+            def profiled(**kwargs):
+                profile = current_profile.get()
+                if profile is None:
+                    return call(**kwargs)
+                return profile.attach(call, kwargs)
+
+        self.dependant.call = profiled
+        return super().get_route_handler()
+
+
+def safe_name(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", value).strip("_") or "root"
+
+
+class ProfilerMiddleware:
+    def __init__(
+        self,
+        app,
+        output_dir: str,
+        token: Optional[str],
+        sample_rate: float,
+        interval: float,
+    ):
+        self.app = app
+        self.output_dir = output_dir
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        os.makedirs(output_dir, exist_ok=True)
+        install_db_hooks()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._triggered(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = self._header(scope, b"x-request-id")
+        request_id = safe_name(request_id) if request_id else uuid.uuid4().hex
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", request_id.encode())
+                ]
+            await send(message)
+
+        profile = RequestProfile(self.interval)
+        context_token = current_profile.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profile.stop()
+            current_profile.reset(context_token)
+            route = scope.get("route")
+            name = safe_name(route.path if route is not None else scope["path"])
+            path = os.path.join(self.output_dir, f"{name}-{request_id}.folded")
+            profile.write(path)
+            logger.info(
+                "Profile %s: %d samples, %d statements, %.3fs in DB",
+                path,
+                sum(profile.samples.values()),
+                profile.db_statements,
+                profile.db_seconds,
+            )
+
+    def _triggered(self, scope) -> bool:
+        if self.token:
+            value = self._header(scope, b"x-profile")
+            if value is not None and hmac.compare_digest(
+                value.encode(), self.token.encode()
+            ):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _header(self, scope, name: bytes) -> Optional[str]:
+        for key, value in scope["headers"]:
+            if key == name:
+                return value.decode("latin-1")
+        return None
@@ -0,0 +1,114 @@
+import argparse
+import json
+import logging
+import uuid
+from collections import Counter
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from .auth import hash_passwords
+from .database import SessionLocal, get_engine, id_in
+from .models import Employee, Organization, OrganizationResponsible
+from .schemas import Roster, RosterResponse
+from .settings import get_project_settings
+from .shared_cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+
+class UsernameConflict(Exception):
+    def __init__(self, usernames: list[str]):
+        super().__init__(f"Usernames already exist: {', '.join(usernames)}")
+        self.usernames = usernames
+
+
+def insert_batches(db: Session, model, rows: list[dict], batch_size: int):
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(model), rows[start : start + batch_size])
+
+
+def provision_organization(
+    db: Session, roster: Roster, batch_size: int
+) -> RosterResponse:
+    usernames = [employee.username for employee in roster.employees]
+    duplicates = sorted(name for name, n in Counter(usernames).items() if n > 1)
+    if duplicates:
+        raise UsernameConflict(duplicates)
+    # Занятые имена проверяются до хэширования: bcrypt — самая дорогая часть.
+    existing = (
+        db.execute(
+            select(Employee.username).where(id_in(db, Employee.username, usernames))
+        )
+        .scalars()
+        .all()
+    )
+    if existing:
+        raise UsernameConflict(sorted(existing))
+    # Транзакция проверки закрывается до bcrypt, чтобы не держать соединение;
+    # гонку за имя после неё ловит уникальный индекс при вставке.
+    db.rollback()
+
+    hashes = hash_passwords([employee.password for employee in roster.employees])
+
+    # Идентификаторы генерируются заранее: вставкам не нужен RETURNING.
+    organization_id = uuid.uuid4()
+    employees = [
+        {
+            "id": uuid.uuid4(),
+            "username": employee.username,
+            "hashed_password": hashed_password,
+            "first_name": employee.first_name,
+            "last_name": employee.last_name,
+            "organization_id": organization_id,
+        }
+        for employee, hashed_password in zip(roster.employees, hashes)
+    ]
+    responsibles = [
+        {"id": uuid.uuid4(), "organization_id": organization_id, "user_id": row["id"]}
+        for employee, row in zip(roster.employees, employees)
+        if employee.responsible
+    ]
+    db.execute(
+        insert(Organization).values(
+            id=organization_id, **roster.organization.model_dump(mode="json")
+        )
+    )
+    insert_batches(db, Employee, employees, batch_size)
+    insert_batches(db, OrganizationResponsible, responsibles, batch_size)
+    db.commit()
+    invalidate("directory")
+    logger.info(
+        "Provisioned organization %s with %d employees", organization_id, len(employees)
+    )
+    return RosterResponse(
+        organization_id=organization_id,
+        employee_ids={row["username"]: row["id"] for row in employees},
+        responsible_count=len(responsibles),
+    )
+
+
+def main():
+    settings = get_project_settings()
+    parser = argparse.ArgumentParser(
+        description="Создание организации, сотрудников и ответственных по JSON-списку."
+    )
+    parser.add_argument("roster", help="путь к JSON-файлу со списком")
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.PROVISIONING_BATCH_SIZE
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with open(args.roster) as f:
+        roster = Roster.model_validate(json.load(f))
+    with SessionLocal(bind=get_engine()) as db:
+        try:
+            result = provision_organization(db, roster, args.batch_size)
+        except UsernameConflict as exc:
+            parser.exit(1, f"{exc}\n")
+    print(result.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
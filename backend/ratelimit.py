@@ -0,0 +1,172 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from jose import JWTError, jwt
+from starlette.responses import JSONResponse
+
+from .settings import get_project_settings
+
+ALGORITHM = "HS256"
+
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+
+class InMemoryBucketStore:
+    # Вызывается только из event loop без await внутри, поэтому блокировки
+    # не нужны: проверка и списание токенов атомарны для остальных корутин.
+    max_keys = 100_000
+
+    def __init__(self):
+        # Ведро: токены, время обновления и момент, когда оно снова станет
+        # полным. Полное ведро ничем не отличается от нового, поэтому после
+        # этого момента его можно удалить (как EXPIRE в Redis). Порядок
+        # словаря — по последнему обращению.
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    async def take(self, key: str, cost: float, rate: float, capacity: float) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._evict(now)
+            bucket = self._buckets[key] = [capacity, now, now]
+        else:
+            self._buckets.move_to_end(key)
+        tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        wait = 0.0
+        if tokens >= cost:
+            tokens -= cost
+        else:
+            wait = (cost - tokens) / rate
+        bucket[:] = [tokens, now, now + (capacity - tokens) / rate]
+        return wait
+
+    def _evict(self, now: float):
+        # Снимаем с головы давно не использованные ведра, пока они уже полные;
+        # при переполнении вытесняется самое старое, даже если не наполнилось.
+        while self._buckets:
+            key, bucket = next(iter(self._buckets.items()))
+            if bucket[2] > now and len(self._buckets) < self.max_keys:
+                break
+            del self._buckets[key]
+
+
+class RedisBucketStore:
+    def __init__(self, redis):
+        self._script = redis.register_script(TOKEN_BUCKET_LUA)
+
+    async def take(self, key: str, cost: float, rate: float, capacity: float) -> float:
+        wait = await self._script(
+            keys=[f"ratelimit:{key}"], args=[rate, capacity, cost, time.time()]
+        )
+        return float(wait)
+
+
+def build_bucket_store(redis_url: Optional[str]):
+    if not redis_url:
+        return InMemoryBucketStore()
+    from redis.asyncio import Redis
+
+    return RedisBucketStore(Redis.from_url(redis_url))
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app,
+        store,
+        user_rate: float,
+        user_burst: float,
+        ip_rate: float,
+        ip_burst: float,
+        route_costs: dict[str, float],
+        max_in_flight: int,
+    ):
+        self.app = app
+        self.store = store
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.route_costs = route_costs
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self.in_flight >= self.max_in_flight:
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is overloaded, retry later"},
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        cost = self.route_costs.get(scope["path"], 1)
+        if cost:
+            wait = await self._take(scope, cost)
+            if wait > 0:
+                response = JSONResponse(
+                    status_code=429,
+                    content={"detail": "Too many requests"},
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+                await response(scope, receive, send)
+                return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def _take(self, scope, cost: float) -> float:
+        client = scope.get("client")
+        ip = client[0] if client else "unknown"
+        wait = await self.store.take(f"ip:{ip}", cost, self.ip_rate, self.ip_burst)
+        subject = self._subject(scope)
+        if subject and not wait:
+            wait = await self.store.take(
+                f"sub:{subject}", cost, self.user_rate, self.user_burst
+            )
+        return wait
+
+    def _subject(self, scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() != "bearer":
+                    return None
+                try:
+                    payload = jwt.decode(
+                        token,
+                        get_project_settings().SECRET_KEY,
+                        algorithms=[ALGORITHM],
+                    )
+                except JWTError:
+                    return None
+                return payload.get("sub")
+        return None
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, ConfigDict, UUID4
+from pydantic import BaseModel, ConfigDict, Field, UUID4
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -119,6 +119,25 @@ class TokenData(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+
+class BidListItem(BaseModel):
+    id: UUID4
+    tender_id: UUID4
+    status: BidStatus
+    price: float
+    created_at: datetime
+    tender_title: Optional[str] = None
+
+
+class BidPage(BaseModel):
+    items: List[BidListItem]
+    next_cursor: Optional[str] = None
 
 
 class BidReviewBase(BaseModel):
@@ -136,3 +155,58 @@ class BidReviewResponse(BidReviewBase):
     reviewer_id: UUID4
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class BidReviewDecision(BidReviewBase):
+    bid_id: UUID4
+
+
+class BidReviewBulkCreate(BaseModel):
+    decisions: List[BidReviewDecision] = Field(min_length=1, max_length=1000)
+
+
+class BidReviewBulkResponse(BaseModel):
+    created: List[BidReviewResponse]
+    skipped: List[UUID4]
+
+
+class BatchRequest(BaseModel):
+    ids: List[UUID4] = Field(min_length=1, max_length=200)
+
+
+class TenderBatchItem(BaseModel):
+    id: UUID4
+    title: str
+    description: Optional[str] = None
+    serviceType: Optional[str] = None
+    status: TenderStatus
+    version: int
+    organization_id: Optional[UUID4] = None
+    created_at: datetime
+
+
+class TenderBatchResponse(BaseModel):
+    items: List[TenderBatchItem]
+    missing: List[UUID4]
+
+
+class BidBatchResponse(BaseModel):
+    items: List[BidResponse]
+    missing: List[UUID4]
+
+
+class RosterEmployee(EmployeeBase):
+    username: str = Field(min_length=1, max_length=50)
+    password: str = Field(min_length=1)
+    responsible: bool = False
+
+
+class Roster(BaseModel):
+    organization: OrganizationCreate
+    employees: List[RosterEmployee] = Field(min_length=1, max_length=5000)
+
+
+class RosterResponse(BaseModel):
+    organization_id: UUID4
+    employee_ids: dict[str, UUID4]
+    responsible_count: int
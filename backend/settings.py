@@ -1,3 +1,6 @@
+from functools import lru_cache
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -6,14 +9,88 @@ class Settings(BaseSettings):
 
 
 class ProjectSettings(Settings):
-    SERVER_ADDRESS: str
-    POSTGRES_CONN: str
-    POSTGRES_USERNAME: str
-    POSTGRES_PASSWORD: str
-    POSTGRES_HOST: str
-    POSTGRES_PORT: str
-    POSTGRES_DATABASE: str
+    SERVER_ADDRESS: str = "0.0.0.0:8080"
     SECRET_KEY: str
 
+    DB_BACKEND: Literal["postgres", "sqlite"] = "postgres"
+    SQLITE_PATH: str = ":memory:"
+
+    POSTGRES_CONN: Optional[str] = None
+    POSTGRES_USERNAME: Optional[str] = None
+    POSTGRES_PASSWORD: Optional[str] = None
+    POSTGRES_HOST: Optional[str] = None
+    POSTGRES_PORT: Optional[str] = None
+    POSTGRES_DATABASE: Optional[str] = None
+
+    POSTGRES_REPLICA_CONN: Optional[str] = None
+    REPLICA_STICKY_SECONDS: float = 5.0
+    REPLICA_MAX_LAG_SECONDS: float = 2.0
+    REPLICA_CHECK_INTERVAL_SECONDS: float = 1.0
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_WARMUP: int = 2
+    DB_CREATE_TABLES: bool = True
+
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_USER_RATE: float = 20.0
+    RATE_LIMIT_USER_BURST: float = 100.0
+    RATE_LIMIT_IP_RATE: float = 50.0
+    RATE_LIMIT_IP_BURST: float = 200.0
+    RATE_LIMIT_ROUTE_COSTS: dict[str, float] = {
+        "/api/token": 20.0,
+        "/api/register_user": 20.0,
+        "/api/ping": 0.0,
+        "/api/live": 0.0,
+        "/api/ready": 0.0,
+        "/api/metrics": 0.0,
+    }
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    MAX_IN_FLIGHT_REQUESTS: int = 256
+
+    AUDIT_QUEUE_SIZE: int = 10_000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 0.5
+    AUDIT_ENQUEUE_BLOCK_SECONDS: float = 0.05
+
+    ARCHIVE_AFTER_DAYS: int = 30
+    ARCHIVE_BATCH_SIZE: int = 500
+
+    PROFILER_DIR: Optional[str] = None
+    PROFILER_TOKEN: Optional[str] = None
+    PROFILER_SAMPLE_RATE: float = 0.0
+    PROFILER_INTERVAL_SECONDS: float = 0.005
+
+    SHARED_CACHE_PATH: Optional[str] = None
+    SHARED_CACHE_SIZE_MB: int = 64
+    SHARED_CACHE_SLOTS: int = 4096
+    LOCAL_CACHE_MAX_ENTRIES: int = 1024
+    LOCAL_CACHE_TTL_SECONDS: float = 30.0
+
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL_SECONDS: float = 24 * 60 * 60
+    IDEMPOTENCY_LEASE_SECONDS: float = 30.0
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0
+
+    REQUEST_DEADLINE_SECONDS: float = 30.0
+    MAX_REQUEST_DEADLINE_SECONDS: float = 120.0
+    ROUTE_DEADLINE_SECONDS: dict[str, float] = {
+        "/api/tenders": 5.0,
+        "/api/bids/my": 5.0,
+        "/api/ping": 0.0,
+        "/api/live": 0.0,
+        "/api/ready": 0.0,
+    }
+    CANCEL_ON_DISCONNECT: bool = True
+
+    APPROVAL_LOCK_TIMEOUT_SECONDS: float = 2.0
+
+    PROVISIONING_TOKEN: Optional[str] = None
+    PROVISIONING_BATCH_SIZE: int = 500
+
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+
 
-project_settings = ProjectSettings()
+@lru_cache
+def get_project_settings() -> ProjectSettings:
+    return ProjectSettings()
@@ -0,0 +1,280 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Optional
+
+from . import metrics
+from .settings import get_project_settings
+
+MAGIC = b"TFCACHE3"
+NAMESPACES = {"tenders": 0, "directory": 1, "analytics": 2}
+KEY_GENERATIONS = 1024
+
+# magic, число слотов, размер области данных, смещение записи, поколения
+# пространств имен, затем поколения ключей (ключи хэшируются в корзины)
+HEADER = struct.Struct(f"<8sQQQ{len(NAMESPACES)}Q{KEY_GENERATIONS}Q")
+WRITE_OFFSET = 24
+GENERATIONS = 32
+KEY_GENERATIONS_OFFSET = GENERATIONS + 8 * len(NAMESPACES)
+# seq, дайджест ключа, пространство имен, поколение, смещение, длина,
+# срок годности (unix-время, 0 — бессрочно)
+SLOT = struct.Struct("<Q16sIQQId")
+
+
+def key_digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+class GenerationalCache:
+    metrics_prefix = "shared_cache"
+
+    def get_or_set(
+        self,
+        namespace: str,
+        key: str,
+        load: Callable[[], bytes],
+        ttl: Optional[float] = None,
+    ) -> bytes:
+        value = self.get(namespace, key)
+        if value is not None:
+            metrics.inc(f"{self.metrics_prefix}.{namespace}.hit")
+            return value
+        metrics.inc(f"{self.metrics_prefix}.{namespace}.miss")
+        # Поколение берется до чтения из БД: если запись успеет его сменить,
+        # устаревшее значение просто не будет найдено.
+        generation = self.generation(namespace, key)
+        value = load()
+        self.put(namespace, key, value, generation, ttl)
+        return value
+
+
+class SharedCache(GenerationalCache):
+    # Общий для воркеров узла кэш в отображенном в память файле. Запись идет
+    # под flock, чтение без блокировок: слот защищен счетчиком seq (seqlock).
+    def __init__(self, path: str, size: int, slot_count: int):
+        self.slot_count = slot_count
+        self.data_start = HEADER.size + SLOT.size * slot_count
+        self.data_size = size - self.data_start
+        if self.data_size <= 0:
+            raise ValueError("Shared cache segment is too small for its slots")
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            if os.fstat(self._fd).st_size != size:
+                os.ftruncate(self._fd, size)
+            self._mm = mmap.mmap(self._fd, size)
+            magic, slots, data_size = struct.unpack_from("<8sQQ", self._mm, 0)
+            if (magic, slots, data_size) != (MAGIC, slot_count, self.data_size):
+                self._mm[: self.data_start] = bytes(self.data_start)
+                HEADER.pack_into(
+                    self._mm,
+                    0,
+                    MAGIC,
+                    slot_count,
+                    self.data_size,
+                    0,
+                    *[0] * (len(NAMESPACES) + KEY_GENERATIONS),
+                )
+
+    @contextmanager
+    def _locked(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _generation_offset(self, namespace: str) -> int:
+        return GENERATIONS + 8 * NAMESPACES[namespace]
+
+    def _key_generation_offset(self, digest: bytes) -> int:
+        index = int.from_bytes(digest[8:], "little") % KEY_GENERATIONS
+        return KEY_GENERATIONS_OFFSET + 8 * index
+
+    def _slot(self, digest: bytes) -> int:
+        index = int.from_bytes(digest[:8], "little") % self.slot_count
+        return HEADER.size + SLOT.size * index
+
+    def _read_counter(self, offset: int) -> int:
+        return struct.unpack_from("<Q", self._mm, offset)[0]
+
+    def generation(self, namespace: str, key: Optional[str] = None) -> int:
+        # Оба счетчика только растут, поэтому их сумма меняется при любой
+        # инвалидации — и всего пространства имен, и отдельного ключа.
+        generation = self._read_counter(self._generation_offset(namespace))
+        if key is not None:
+            generation += self._read_counter(
+                self._key_generation_offset(key_digest(key))
+            )
+        return generation
+
+    def invalidate(self, namespace: str, key: Optional[str] = None):
+        if key is None:
+            offset = self._generation_offset(namespace)
+        else:
+            offset = self._key_generation_offset(key_digest(key))
+        with self._locked():
+            struct.pack_into("<Q", self._mm, offset, self._read_counter(offset) + 1)
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        digest = key_digest(key)
+        slot = self._slot(digest)
+        seq, slot_digest, ns, generation, offset, length, expires_at = SLOT.unpack_from(
+            self._mm, slot
+        )
+        if (
+            seq % 2
+            or slot_digest != digest
+            or ns != NAMESPACES[namespace]
+            or generation != self.generation(namespace, key)
+            or (expires_at and expires_at <= time.time())
+        ):
+            return None
+        start = self.data_start + offset
+        value = self._mm[start : start + length]
+        # Слот переписали, пока мы копировали данные: считаем промахом.
+        if struct.unpack_from("<Q", self._mm, slot)[0] != seq:
+            return None
+        return value
+
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        value: bytes,
+        generation: int,
+        ttl: Optional[float] = None,
+    ):
+        if len(value) > self.data_size:
+            return
+        digest = key_digest(key)
+        slot = self._slot(digest)
+        with self._locked():
+            write_offset = struct.unpack_from("<Q", self._mm, WRITE_OFFSET)[0]
+            if write_offset + len(value) > self.data_size:
+                # Область данных закончилась: сбрасываем все слоты и пишем сначала.
+                for other in range(self.slot_count):
+                    position = HEADER.size + SLOT.size * other
+                    seq = struct.unpack_from("<Q", self._mm, position)[0]
+                    SLOT.pack_into(
+                        self._mm, position, seq + 2, bytes(16), 0, 0, 0, 0, 0
+                    )
+                write_offset = 0
+            seq = struct.unpack_from("<Q", self._mm, slot)[0]
+            struct.pack_into("<Q", self._mm, slot, seq + 1)
+            start = self.data_start + write_offset
+            self._mm[start : start + len(value)] = value
+            SLOT.pack_into(
+                self._mm,
+                slot,
+                seq + 2,
+                digest,
+                NAMESPACES[namespace],
+                generation,
+                write_offset,
+                len(value),
+                time.time() + ttl if ttl is not None else 0,
+            )
+            struct.pack_into("<Q", self._mm, WRITE_OFFSET, write_offset + len(value))
+
+    def close(self):
+        self._mm.close()
+        os.close(self._fd)
+
+
+class LocalCache(GenerationalCache):
+    # Кэш одного процесса на случай, когда общий не настроен. Поколения те же,
+    # но инвалидации из других воркеров сюда не доходят, поэтому значение
+    # живет не дольше ttl.
+    metrics_prefix = "local_cache"
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._generations = dict.fromkeys(NAMESPACES, 0)
+        self._key_generations = [0] * KEY_GENERATIONS
+        self._entries: OrderedDict[tuple[str, str], tuple] = OrderedDict()
+
+    def _bucket(self, key: str) -> int:
+        return int.from_bytes(key_digest(key)[8:], "little") % KEY_GENERATIONS
+
+    def generation(self, namespace: str, key: Optional[str] = None) -> int:
+        generation = self._generations[namespace]
+        if key is not None:
+            generation += self._key_generations[self._bucket(key)]
+        return generation
+
+    def invalidate(self, namespace: str, key: Optional[str] = None):
+        with self._lock:
+            if key is None:
+                self._generations[namespace] += 1
+            else:
+                self._key_generations[self._bucket(key)] += 1
+
+    def get(self, namespace: str, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return None
+            generation, expires_at, value = entry
+            if (
+                generation != self.generation(namespace, key)
+                or expires_at <= time.monotonic()
+            ):
+                del self._entries[(namespace, key)]
+                return None
+            self._entries.move_to_end((namespace, key))
+            return value
+
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        value: bytes,
+        generation: int,
+        ttl: Optional[float] = None,
+    ):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._entries[(namespace, key)] = (
+                generation,
+                time.monotonic() + ttl,
+                value,
+            )
+            self._entries.move_to_end((namespace, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@lru_cache
+def get_shared_cache() -> Optional[SharedCache]:
+    settings = get_project_settings()
+    if not settings.SHARED_CACHE_PATH:
+        return None
+    return SharedCache(
+        settings.SHARED_CACHE_PATH,
+        settings.SHARED_CACHE_SIZE_MB * 1024 * 1024,
+        settings.SHARED_CACHE_SLOTS,
+    )
+
+
+@lru_cache
+def get_local_cache() -> LocalCache:
+    settings = get_project_settings()
+    return LocalCache(
+        settings.LOCAL_CACHE_MAX_ENTRIES, settings.LOCAL_CACHE_TTL_SECONDS
+    )
+
+
+def invalidate(namespace: str, key: Optional[str] = None):
+    cache = get_shared_cache()
+    if cache is not None:
+        cache.invalidate(namespace, key)
+    get_local_cache().invalidate(namespace, key)
@@ -0,0 +1,273 @@
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache, partial
+from typing import Callable
+
+from fastapi.security import OAuth2PasswordRequestForm
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+
+from backend.auth import (
+    create_access_token,
+    get_password_hash,
+    issue_refresh_token,
+    verify_password,
+)
+from backend.database import SessionLocal, build_engine
+from backend.dependencies import decode_token
+from backend.endpoints import login_for_access_token, refresh_access_token
+from backend.models import Base, Bid, BidReview, BidStatus, Employee, RefreshToken
+from backend.schemas import (
+    BidResponse,
+    BidReviewResponse,
+    RefreshTokenRequest,
+    TenderResponse,
+)
+from backend.settings import get_project_settings
+
+BATCH_SIZES = (1, 10, 100, 1000)
+# Интеграция продлевает доступ раз в 30 минут; клиенты обслуживаются по кругу.
+RENEWALS_PER_DAY = 48
+RENEWAL_CLIENTS = 50
+
+
+def make_bid() -> Bid:
+    now = datetime.now()
+    return Bid(
+        id=uuid.uuid4(),
+        tender_id=uuid.uuid4(),
+        author_id=uuid.uuid4(),
+        description="Bid description",
+        price=1000.0,
+        status=BidStatus.PUBLISHED,
+        version=1,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def make_review() -> BidReview:
+    return BidReview(
+        id=uuid.uuid4(),
+        bid_id=uuid.uuid4(),
+        reviewer_id=uuid.uuid4(),
+        review="Looks good",
+        status=BidStatus.APPROVED,
+    )
+
+
+def create_clients(db, prefix: str, password_hash: str, revoked: bool) -> list:
+    # Таблица в установившемся состоянии: за REFRESH_TOKEN_EXPIRE_DAYS у
+    # клиента накапливается по строке на каждое продление (при обмене они
+    # остаются отозванными, при входе по паролю — действующими).
+    days = get_project_settings().REFRESH_TOKEN_EXPIRE_DAYS
+    now = datetime.now()
+    user_ids = [uuid.uuid4() for _ in range(RENEWAL_CLIENTS)]
+    db.execute(
+        insert(Employee),
+        [
+            {
+                "id": user_id,
+                "username": f"{prefix}{i}",
+                "hashed_password": password_hash,
+            }
+            for i, user_id in enumerate(user_ids)
+        ],
+    )
+    for user_id in user_ids:
+        db.execute(
+            insert(RefreshToken),
+            [
+                {
+                    "id": uuid.uuid4(),
+                    "token_hash": uuid.uuid4().hex,
+                    "user_id": user_id,
+                    "revoked": revoked,
+                    "expires_at": now + timedelta(days=days, minutes=-30 * i),
+                }
+                for i in range(days * RENEWALS_PER_DAY)
+            ],
+        )
+    return user_ids
+
+
+def build_renewal_benchmarks(
+    password_hash: str,
+) -> dict[str, Callable[[], object]]:
+    # Оба сценария продления через эндпоинты на SQLite в памяти: вход по паролю
+    # (bcrypt, DELETE и INSERT refresh-токена) и обмен refresh-токена
+    # (UPDATE ... RETURNING, DELETE, INSERT).
+    engine = build_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = SessionLocal(bind=engine)
+    create_clients(db, "login", password_hash, revoked=False)
+    refresh_users = create_clients(db, "refresh", password_hash, revoked=True)
+    current_tokens = [issue_refresh_token(db, user_id) for user_id in refresh_users]
+    db.commit()
+    turns = itertools.count()
+
+    def login():
+        form = OAuth2PasswordRequestForm(
+            username=f"login{next(turns) % RENEWAL_CLIENTS}", password="password"
+        )
+        return login_for_access_token(form, db)
+
+    def refresh():
+        client = next(turns) % RENEWAL_CLIENTS
+        token = refresh_access_token(
+            RefreshTokenRequest(refresh_token=current_tokens[client]), db
+        )
+        current_tokens[client] = token.refresh_token
+        return token
+
+    return {"renewal.login": login, "renewal.refresh": refresh}
+
+
+def build_benchmarks() -> dict[str, Callable[[], Callable[[], object]]]:
+    # Имя -> подготовка, возвращающая измеряемую функцию: данные (bcrypt,
+    # таблица refresh-токенов, пачки ORM-объектов) готовятся только для
+    # бенчмарков, прошедших --filter.
+    token = create_access_token({"sub": str(uuid.uuid4())}, timedelta(minutes=30))
+    bid_payload = {
+        column: getattr(make_bid(), column) for column in BidResponse.model_fields
+    }
+    review_payload = {
+        column: getattr(make_review(), column)
+        for column in BidReviewResponse.model_fields
+    }
+    bid_list = TypeAdapter(list[BidResponse])
+    review_list = TypeAdapter(list[BidReviewResponse])
+
+    @lru_cache
+    def password_hash() -> str:
+        return get_password_hash("password")
+
+    @lru_cache
+    def renewal() -> dict[str, Callable[[], object]]:
+        return build_renewal_benchmarks(password_hash())
+
+    def bcrypt_verify():
+        hashed_password = password_hash()
+        return lambda: verify_password("password", hashed_password)
+
+    def bids_to_schema(size: int):
+        bids = [make_bid() for _ in range(size)]
+        return lambda: bid_list.validate_python(bids, from_attributes=True)
+
+    def reviews_to_schema(size: int):
+        reviews = [make_review() for _ in range(size)]
+        return lambda: review_list.validate_python(reviews, from_attributes=True)
+
+    benchmarks = {
+        "auth.create_access_token": lambda: lambda: create_access_token(
+            {"sub": "user"}, timedelta(minutes=30)
+        ),
+        "auth.decode_token": lambda: lambda: decode_token(token),
+        "auth.bcrypt_hash": lambda: lambda: get_password_hash("password"),
+        "auth.bcrypt_verify": bcrypt_verify,
+        "renewal.login": lambda: renewal()["renewal.login"],
+        "renewal.refresh": lambda: renewal()["renewal.refresh"],
+        "schema.BidResponse": lambda: lambda: BidResponse.model_validate(bid_payload),
+        "schema.BidReviewResponse": lambda: lambda: BidReviewResponse.model_validate(
+            review_payload
+        ),
+        "schema.TenderResponse": lambda: lambda: TenderResponse(
+            success=True,
+            description="Тендер успешно создан.",
+            data={"id": bid_payload["id"], "created_at": bid_payload["created_at"]},
+        ),
+    }
+    for size in BATCH_SIZES:
+        benchmarks[f"orm_to_schema.BidResponse[{size}]"] = partial(bids_to_schema, size)
+        benchmarks[f"orm_to_schema.BidReviewResponse[{size}]"] = partial(
+            reviews_to_schema, size
+        )
+    return benchmarks
+
+
+def measure(fn: Callable[[], object], repeat: int) -> dict:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    timings = [t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "median_us": statistics.median(timings),
+        "min_us": min(timings),
+        "max_us": max(timings),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run(names_filter: str, repeat: int) -> dict:
+    results = {}
+    for name, setup in build_benchmarks().items():
+        if names_filter and names_filter not in name:
+            continue
+        results[name] = measure(setup(), repeat)
+        print(f"{name:45} {results[name]['median_us']:12.2f} us", file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created_at": datetime.now().isoformat(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        ratio = result["median_us"] / previous["median_us"]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {previous['median_us']:.2f} us -> "
+                f"{result['median_us']:.2f} us ({ratio - 1:+.0%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Микробенчмарки авторизации и сериализации."
+    )
+    parser.add_argument("--output", help="Куда сохранить результаты в JSON.")
+    parser.add_argument("--baseline", help="JSON с результатами для сравнения.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Допустимое замедление относительно baseline (0.1 = 10%%).",
+    )
+    parser.add_argument("--filter", default="", help="Подстрока в имени бенчмарка.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    current = run(args.filter, args.repeat)
+    output = json.dumps(current, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
+import os
+
+# По умолчанию тесты идут на встроенной SQLite в памяти; DB_BACKEND=postgres — на сервере.
+os.environ.setdefault("DB_BACKEND", "sqlite")
+
 import pytest
 from fastapi.testclient import TestClient
+from backend import shared_cache
 from backend.app_factory import create_app
-from backend.database import SessionLocal, engine
+from backend.database import SessionLocal, get_engine
 from backend.models import Base
+from backend.settings import get_project_settings
 
 
 @pytest.fixture(scope="module")
@@ -14,8 +21,20 @@ def client():
 
 @pytest.fixture(scope="function")
 def db_session():
+    engine = get_engine()
     Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
+    db = SessionLocal(bind=engine)
     yield db
     db.close()
     Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def enabled_shared_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHARED_CACHE_PATH", str(tmp_path / "cache"))
+    get_project_settings.cache_clear()
+    shared_cache.get_shared_cache.cache_clear()
+    yield shared_cache.get_shared_cache()
+    monkeypatch.delenv("SHARED_CACHE_PATH")
+    get_project_settings.cache_clear()
+    shared_cache.get_shared_cache.cache_clear()
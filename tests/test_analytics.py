@@ -0,0 +1,106 @@
+from backend.models import Bid
+from tests.utils import (
+    create_test_organization,
+    create_test_user,
+    create_test_tender,
+    assign_responsibility,
+    login,
+)
+
+
+def add_bids(db, tender, author, prices):
+    for price in prices:
+        db.add(
+            Bid(
+                tender_id=tender.id,
+                author_id=author.id,
+                description="Bid",
+                price=price,
+                version=1,
+                status="CREATED",
+            )
+        )
+    db.commit()
+
+
+def test_tender_price_analytics(client, db_session, enabled_shared_cache):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    add_bids(db_session, test_tender, test_user, [100, 102, 98, 101, 99, 10, 500])
+    headers = login(client, test_user)
+
+    response = client.get(
+        f"/api/tenders/{test_tender.id}/bids/analytics", headers=headers
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 7
+    assert data["quantiles"]["p50"] == 100
+    assert {(o["price"], o["kind"]) for o in data["outliers"]} == {
+        (10, "LOW"),
+        (500, "HIGH"),
+    }
+    high = next(o for o in data["outliers"] if o["kind"] == "HIGH")
+    assert high["z_score"] > 2
+
+    # Новое предложение сбрасывает закэшированный результат тендера.
+    response = client.post(
+        "/api/bids/new",
+        json={"tender_id": str(test_tender.id), "description": "New", "price": 103},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    response = client.get(
+        f"/api/tenders/{test_tender.id}/bids/analytics", headers=headers
+    )
+    assert response.json()["count"] == 8
+
+    response = client.get("/api/tenders/analytics", headers=headers)
+    assert response.status_code == 200
+    assert [item["count"] for item in response.json()] == [8]
+
+
+def test_tender_price_analytics_forbidden(client, db_session):
+    test_organization = create_test_organization(db_session)
+    other_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    other_user = create_test_user(db_session, other_organization.id, "other_user")
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+
+    response = client.get(
+        f"/api/tenders/{test_tender.id}/bids/analytics",
+        headers=login(client, other_user),
+    )
+
+    assert response.status_code == 403
+
+
+def test_moving_bid_invalidates_both_tenders(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+    first_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    second_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    add_bids(db_session, first_tender, test_user, [100, 110])
+    headers = login(client, test_user)
+
+    def count(tender):
+        response = client.get(
+            f"/api/tenders/{tender.id}/bids/analytics", headers=headers
+        )
+        return response.json()["count"]
+
+    # Без общего кэша результаты держит кэш процесса.
+    assert (count(first_tender), count(second_tender)) == (2, 0)
+    moved = db_session.query(Bid).filter(Bid.tender_id == first_tender.id).first()
+    response = client.patch(
+        f"/api/bids/{moved.id}/edit",
+        json={"tender_id": str(second_tender.id), "description": "Moved", "price": 90},
+        headers=headers,
+    )
+    assert response.status_code == 200
+
+    assert (count(first_tender), count(second_tender)) == (1, 1)
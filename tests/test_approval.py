@@ -0,0 +1,109 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import select
+
+from backend.database import SessionLocal, get_engine
+from backend.models import Bid, Tender
+from tests.utils import (
+    create_test_organization,
+    create_test_user,
+    create_test_tender,
+    assign_responsibility,
+    create_test_bid,
+    create_test_review,
+    login,
+)
+
+postgres_only = pytest.mark.skipif(
+    os.environ.get("DB_BACKEND") != "postgres",
+    reason="Блокировки строк проверяются только на PostgreSQL",
+)
+
+
+def approved_tender(db_session, bids=2):
+    # Один ответственный — кворум в один одобряющий отзыв на каждое предложение.
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    test_bids = []
+    for _ in range(bids):
+        test_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+        create_test_review(db_session, test_bid.id, test_user.id, "ok", "APPROVED")
+        test_bids.append(test_bid)
+    return test_user, test_tender, test_bids
+
+
+def test_second_approval_on_closed_tender_conflicts(client, db_session):
+    test_user, test_tender, (first_bid, second_bid) = approved_tender(db_session)
+    headers = login(client, test_user)
+
+    response = client.post(f"/api/bids/{first_bid.id}/approve", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["status"] == "APPROVED"
+
+    response = client.post(f"/api/bids/{second_bid.id}/approve", headers=headers)
+    assert response.status_code == 409
+
+    db_session.expire_all()
+    assert db_session.get(Tender, test_tender.id).status.value == "CLOSED"
+    assert db_session.get(Bid, second_bid.id).status.value == "REJECTED"
+
+
+def test_rejecting_review_blocks_approval(client, db_session):
+    test_user, test_tender, (test_bid,) = approved_tender(db_session, bids=1)
+    other_user = create_test_user(db_session, test_tender.organization_id, "other_user")
+    create_test_review(db_session, test_bid.id, other_user.id, "no", "REJECTED")
+
+    response = client.post(
+        f"/api/bids/{test_bid.id}/approve", headers=login(client, test_user)
+    )
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "REJECTED"
+
+
+@postgres_only
+def test_concurrent_approvals_have_one_winner(client, db_session):
+    test_user, test_tender, test_bids = approved_tender(db_session, bids=8)
+    headers = login(client, test_user)
+
+    def approve(bid):
+        return client.post(f"/api/bids/{bid.id}/approve", headers=headers)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(approve, test_bids))
+
+    winners = [r for r in responses if r.status_code == 200]
+    assert len(winners) == 1
+    assert winners[0].json()["status"] == "APPROVED"
+    assert all(r.status_code == 409 for r in responses if r not in winners)
+
+
+@postgres_only
+def test_locked_tender_does_not_block_other_tenders(client, db_session):
+    test_user, locked_tender, (locked_bid,) = approved_tender(db_session, bids=1)
+    free_tender = create_test_tender(
+        db_session, locked_tender.organization_id, test_user.id
+    )
+    free_bid = create_test_bid(db_session, free_tender.id, test_user.id)
+    create_test_review(db_session, free_bid.id, test_user.id, "ok", "APPROVED")
+    headers = login(client, test_user)
+
+    with SessionLocal(bind=get_engine()) as holder:
+        holder.execute(
+            select(Tender.id).where(Tender.id == locked_tender.id).with_for_update()
+        )
+
+        started = time.monotonic()
+        response = client.post(f"/api/bids/{free_bid.id}/approve", headers=headers)
+        assert response.status_code == 200
+        assert time.monotonic() - started < 1
+
+        response = client.post(f"/api/bids/{locked_bid.id}/approve", headers=headers)
+        assert response.status_code == 409
+        assert response.headers["Retry-After"] == "1"
+        holder.rollback()
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from backend.archive import archive_closed_tenders
+from backend.models import (
+    ArchivedBid,
+    ArchivedBidReview,
+    ArchivedTender,
+    Bid,
+    BidReview,
+    Tender,
+)
+from tests.utils import (
+    create_test_organization,
+    create_test_user,
+    create_test_tender,
+    assign_responsibility,
+    create_test_bid,
+    create_test_review,
+)
+
+
+def test_archive_closed_tenders(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+
+    closed_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    open_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    closed_bid = create_test_bid(db_session, closed_tender.id, test_user.id)
+    create_test_bid(db_session, open_tender.id, test_user.id)
+    create_test_review(db_session, closed_bid.id, test_user.id, "Fine", "APPROVED")
+
+    closed_tender.status = "CLOSED"
+    db_session.commit()
+
+    archived = archive_closed_tenders(
+        db_session, datetime.now() + timedelta(days=1), batch_size=1
+    )
+
+    assert archived == 1
+    assert [tender.id for tender in db_session.query(Tender)] == [open_tender.id]
+    assert db_session.query(Bid).count() == 1
+    assert db_session.query(BidReview).count() == 0
+    assert db_session.get(ArchivedTender, closed_tender.id).title == "Test Tender"
+    assert db_session.get(ArchivedBid, closed_bid.id).tender_id == closed_tender.id
+    assert db_session.query(ArchivedBidReview).count() == 1
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    response = client.get("/api/tenders/my", headers=headers)
+    assert len(response.json()["data"]["tenders"]) == 1
+
+    response = client.get(
+        "/api/tenders/my", params={"includeArchived": True}, headers=headers
+    )
+    assert len(response.json()["data"]["tenders"]) == 2
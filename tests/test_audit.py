@@ -0,0 +1,54 @@
+from fastapi.testclient import TestClient
+
+from backend import metrics
+from backend.app_factory import create_app
+from backend.audit import AuditLog
+from backend.models import AuditEvent
+from tests.utils import (
+    create_test_organization,
+    create_test_user,
+    create_test_tender,
+    assign_responsibility,
+)
+
+
+def test_transitions_are_flushed_on_shutdown(db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+
+    with TestClient(create_app()) as client:
+        response = client.post(
+            "/api/token", data={"username": test_user.username, "password": "password"}
+        )
+        assert response.status_code == 200
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        response = client.patch(
+            f"/api/tenders/{test_tender.id}/publish", headers=headers
+        )
+        assert response.status_code == 200
+        response = client.post(f"/api/tenders/{test_tender.id}/close", headers=headers)
+        assert response.status_code == 200
+
+    events = (
+        db_session.query(AuditEvent)
+        .filter_by(entity_id=test_tender.id)
+        .order_by(AuditEvent.created_at)
+        .all()
+    )
+    assert [event.action for event in events] == ["tender.publish", "tender.close"]
+    assert events[1].actor_id == test_user.id
+    assert events[1].details["status"] == "CLOSED"
+
+
+def test_full_queue_drops_instead_of_blocking():
+    audit_log = AuditLog(1, 10, 60, 0)
+    dropped = metrics.counters["audit.dropped"]
+
+    audit_log.record("tender.publish", "tender", "a")
+    audit_log.record("tender.publish", "tender", "b")
+
+    assert audit_log._queue.qsize() == 1
+    assert metrics.counters["audit.dropped"] == dropped + 1
@@ -0,0 +1,29 @@
+from benchmarks import hot_paths
+from benchmarks.hot_paths import compare, run
+
+
+def test_compare_flags_only_regressions_above_threshold():
+    baseline = {"results": {"fast": {"median_us": 10.0}, "slow": {"median_us": 10.0}}}
+    current = {
+        "results": {
+            "fast": {"median_us": 10.5},
+            "slow": {"median_us": 13.0},
+            "new": {"median_us": 1.0},
+        }
+    }
+
+    regressions = compare(current, baseline, threshold=0.1)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("slow:")
+
+
+def test_filtered_out_benchmarks_skip_setup(monkeypatch):
+    def build_renewal_benchmarks(password_hash):
+        raise AssertionError("renewal setup must not run")
+
+    monkeypatch.setattr(hot_paths, "build_renewal_benchmarks", build_renewal_benchmarks)
+
+    result = run("auth.decode_token", repeat=1)
+
+    assert list(result["results"]) == ["auth.decode_token"]
@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta
+
 from tests.utils import (
     create_test_organization,
     create_test_user,
@@ -175,3 +177,143 @@ def test_approve_bid(client, db_session):
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "APPROVED"
+
+
+def test_edit_bid_version_conflict(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    test_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    updated_data = {
+        "tender_id": str(test_tender.id),
+        "description": "Updated Bid Description",
+        "price": 2000.00,
+    }
+    response = client.patch(
+        f"/api/bids/{test_bid.id}/edit",
+        json=updated_data,
+        headers={"Authorization": f"Bearer {token}", "If-Match": '"1"'},
+    )
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+
+    response = client.patch(
+        f"/api/bids/{test_bid.id}/edit",
+        json=updated_data,
+        headers={"Authorization": f"Bearer {token}", "If-Match": '"1"'},
+    )
+    assert response.status_code == 409
+
+
+def test_bid_transitions_with_same_if_match(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    test_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}", "If-Match": '"1-CREATED"'}
+
+    response = client.post(f"/api/bids/{test_bid.id}/publish", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1-PUBLISHED"'
+
+    response = client.post(f"/api/bids/{test_bid.id}/cancel", headers=headers)
+    assert response.status_code == 409
+
+
+def test_get_user_bids_pagination(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    created_at = datetime(2024, 1, 1)
+    bids = set()
+    for minutes in (0, 1, 1):
+        bid = create_test_bid(db_session, test_tender.id, test_user.id)
+        bid.created_at = created_at + timedelta(minutes=minutes)
+        bids.add(bid.id)
+    db_session.commit()
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get(
+        "/api/bids/my", params={"limit": 2, "includeTender": True}, headers=headers
+    )
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page["items"]) == 2
+    assert first_page["items"][0]["tender_title"] == "Test Tender"
+    assert first_page["next_cursor"] is not None
+
+    response = client.get(
+        "/api/bids/my",
+        params={"limit": 2, "cursor": first_page["next_cursor"]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    second_page = response.json()
+    assert len(second_page["items"]) == 1
+    assert second_page["next_cursor"] is None
+
+    seen = {item["id"] for item in first_page["items"] + second_page["items"]}
+    assert seen == {str(bid_id) for bid_id in bids}
+
+    response = client.get(
+        "/api/bids/my", params={"status": "PUBLISHED"}, headers=headers
+    )
+    assert response.json()["items"] == []
+
+
+def test_bids_batch(client, db_session):
+    test_organization = create_test_organization(db_session)
+    other_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    other_user = create_test_user(db_session, other_organization.id, "other_user")
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    other_tender = create_test_tender(db_session, other_organization.id, other_user.id)
+    incoming_bid = create_test_bid(db_session, test_tender.id, other_user.id)
+    own_bid = create_test_bid(db_session, other_tender.id, test_user.id)
+    hidden_bid = create_test_bid(db_session, other_tender.id, other_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    token = response.json()["access_token"]
+
+    response = client.post(
+        "/api/bids/batch",
+        json={"ids": [str(own_bid.id), str(hidden_bid.id), str(incoming_bid.id)]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [
+        str(own_bid.id),
+        str(incoming_bid.id),
+    ]
+    assert data["missing"] == [str(hidden_bid.id)]
+
+    response = client.post(
+        "/api/bids/batch",
+        json={"ids": []},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 422
@@ -0,0 +1,74 @@
+import threading
+import time
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+from backend import metrics
+from backend.coalesce import coalesce
+
+
+def test_concurrent_identical_reads_share_one_execution():
+    calls = []
+    gate = threading.Event()
+
+    @coalesce("test_route", params=("service_type",))
+    def list_items(service_type):
+        calls.append(service_type)
+        gate.wait(1)
+        return [{"service_type": service_type}]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(list_items, service_type=" Construction ") for _ in range(8)
+        ]
+        time.sleep(0.1)
+        gate.set()
+        responses = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert {response.body for response in responses} == {
+        b'[{"service_type": " Construction "}]'
+    }
+    assert metrics.counters["coalesce.test_route.executed"] == 1
+    assert metrics.counters["coalesce.test_route.coalesced"] == 7
+
+
+def test_different_scope_is_not_coalesced():
+    calls = []
+
+    @coalesce("scoped_route", scope=lambda kwargs: kwargs["organization_id"])
+    def list_items(organization_id):
+        calls.append(organization_id)
+        return []
+
+    list_items(organization_id="first")
+    list_items(organization_id="second")
+
+    assert calls == ["first", "second"]
+
+
+def test_different_raw_values_are_not_coalesced():
+    calls = []
+
+    @coalesce("raw_route", params=("service_type",))
+    def list_items(service_type):
+        calls.append(service_type)
+        return [service_type]
+
+    assert list_items(service_type="Construction").body == b'["Construction"]'
+    assert list_items(service_type="Construction  ").body == b'["Construction  "]'
+    assert calls == ["Construction", "Construction  "]
+
+
+def test_primary_read_does_not_reuse_replica_result(enabled_shared_cache):
+    calls = []
+
+    @coalesce("routed_route", cache="tenders")
+    def list_items(db):
+        calls.append(db.info.get("replica", False))
+        return []
+
+    list_items(db=SimpleNamespace(info={"replica": True}))
+    list_items(db=SimpleNamespace(info={}))
+
+    assert calls == [True, False]
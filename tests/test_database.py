@@ -0,0 +1,21 @@
+from sqlalchemy import func, select, text
+
+from backend.database import SessionLocal, build_engine
+from backend.models import Base, Organization
+
+
+def test_in_memory_sessions_have_own_transactions():
+    engine = build_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+
+    with SessionLocal(bind=engine) as first, SessionLocal(bind=engine) as second:
+        first.add(Organization(name="Org", description="Org", type="LLC"))
+        first.flush()
+        # Откат чужой сессии не должен завершать транзакцию первой.
+        second.execute(text("SELECT 1"))
+        second.rollback()
+        first.commit()
+
+    engine.dispose()
+    with SessionLocal(bind=engine) as db:
+        assert db.execute(select(func.count()).select_from(Organization)).scalar() == 1
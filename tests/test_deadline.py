@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend import metrics
+from backend.database import get_db
+from backend.deadline import CancelOnDisconnectMiddleware
+
+SLOW_SQL = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c"
+    " WHERE x < 1000000000) SELECT count(*) FROM c"
+)
+
+
+def create_slow_app():
+    app = FastAPI()
+
+    @app.get("/api/slow")
+    def slow(db: Session = Depends(get_db)):
+        return db.execute(SLOW_SQL).scalar()
+
+    @app.get("/api/fast")
+    def fast(db: Session = Depends(get_db)):
+        return db.execute(text("SELECT 1")).scalar()
+
+    app.add_middleware(CancelOnDisconnectMiddleware)
+    return app
+
+
+def test_statement_is_cancelled_at_deadline():
+    client = TestClient(create_slow_app())
+    before = metrics.counters["deadline.exceeded"]
+
+    started = time.monotonic()
+    response = client.get("/api/slow", headers={"X-Request-Timeout": "0.2"})
+
+    assert response.status_code == 504
+    assert time.monotonic() - started < 5
+    assert metrics.counters["deadline.exceeded"] == before + 1
+    # Соединение вернулось в пул без обработчика прерывания.
+    assert client.get("/api/fast").json() == 1
+
+
+def test_invalid_timeout_header():
+    client = TestClient(create_slow_app())
+
+    for value in ("soon", "0", "-1", "nan", "inf"):
+        response = client.get("/api/fast", headers={"X-Request-Timeout": value})
+        assert response.status_code == 400, value
+
+
+def test_statement_is_cancelled_on_disconnect():
+    app = create_slow_app()
+    before = metrics.counters["requests.cancelled"]
+    messages = []
+
+    async def run():
+        sent_request = False
+
+        async def receive():
+            nonlocal sent_request
+            if not sent_request:
+                sent_request = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.sleep(0.2)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/slow",
+            "raw_path": b"/api/slow",
+            "root_path": "",
+            "query_string": b"",
+            "headers": [],
+            "client": ("127.0.0.1", 1234),
+            "server": ("testserver", 80),
+        }
+        await asyncio.wait_for(app(scope, receive, send), timeout=5)
+
+    asyncio.run(run())
+
+    assert messages[0]["status"] == 499
+    assert metrics.counters["requests.cancelled"] == before + 1
+
+
+def test_body_is_not_read_before_the_app():
+    received = []
+
+    async def reject(scope, receive, send):
+        await send({"type": "http.response.start", "status": 429, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive():
+        received.append(True)
+        return {"type": "http.request", "body": b"x" * 1024, "more_body": True}
+
+    async def send(message):
+        pass
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/bids/new",
+        "headers": [(b"content-length", b"1048576")],
+    }
+    asyncio.run(CancelOnDisconnectMiddleware(reject)(scope, receive, send))
+
+    assert received == []
@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+
+from tests.utils import (
+    create_test_organization,
+    create_test_user,
+    create_test_tender,
+    create_test_bid,
+    create_test_review,
+)
+
+
+def test_export_tenders_ndjson(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    create_test_tender(db_session, test_organization.id, test_user.id)
+    create_test_tender(db_session, test_organization.id, test_user.id)
+
+    other_organization = create_test_organization(db_session)
+    other_user = create_test_user(db_session, other_organization.id, "other_user")
+    create_test_tender(db_session, other_organization.id, other_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    response = client.get(
+        "/api/export/tenders", headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 2
+    assert {row["organization_id"] for row in rows} == {str(test_organization.id)}
+    assert rows[0]["description"] == "Test Tender Description"
+
+
+def test_export_bids_and_reviews_csv(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    test_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+    create_test_review(db_session, test_bid.id, test_user.id, "Fine", "APPROVED")
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = client.get("/api/export/bids", params={"format": "csv"}, headers=headers)
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == [str(test_bid.id)]
+    assert rows[0]["status"] == "CREATED"
+
+    response = client.get(
+        "/api/export/reviews", params={"format": "csv"}, headers=headers
+    )
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["review"] for row in rows] == ["Fine"]
+
+
+def test_export_other_organization_forbidden(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    other_organization = create_test_organization(db_session)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    response = client.get(
+        "/api/export/tenders",
+        params={"organizationId": str(other_organization.id)},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 403
@@ -0,0 +1,33 @@
+from fastapi.testclient import TestClient
+
+from backend.app_factory import create_app
+
+
+def test_live_and_ready_after_startup():
+    with TestClient(create_app()) as client:
+        response = client.get("/api/live")
+        assert response.status_code == 200
+
+        response = client.get("/api/ready")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["startup_seconds"] >= 0
+
+
+def test_not_ready_before_startup():
+    client = TestClient(create_app())
+
+    response = client.get("/api/ready")
+
+    assert response.status_code == 503
+
+
+def test_time_to_first_request_is_reported():
+    with TestClient(create_app()) as client:
+        client.get("/api/tenders")
+
+        response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.json()["gauges"]["time_to_first_request_seconds"] > 0
@@ -0,0 +1,82 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+
+from backend.auth import create_access_token
+from backend.idempotency import IdempotencyMiddleware, IdempotencyStore
+from backend.models import Tender
+from tests.utils import (
+    create_test_organization,
+    create_test_user,
+    assign_responsibility,
+    count_statements,
+)
+
+
+def test_retry_replays_stored_response(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    headers = {
+        "Authorization": f"Bearer {response.json()['access_token']}",
+        "Idempotency-Key": "create-tender-1",
+    }
+    tender_data = {
+        "title": "New Tender",
+        "description": "New Tender Description",
+        "serviceType": "Construction",
+    }
+
+    first = client.post("/api/tenders/new", json=tender_data, headers=headers)
+    with count_statements() as statements:
+        second = client.post("/api/tenders/new", json=tender_data, headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert statements
+    assert all("idempotency_keys" in statement for statement in statements)
+    assert db_session.query(Tender).count() == 1
+
+    tender_data["title"] = "Other Tender"
+    response = client.post("/api/tenders/new", json=tender_data, headers=headers)
+    assert response.status_code == 422
+
+
+def test_concurrent_duplicates_wait_for_first_execution(db_session):
+    calls = []
+
+    app = FastAPI()
+
+    @app.post("/api/tenders/new")
+    async def create():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"created": len(calls)}
+
+    app.add_middleware(
+        IdempotencyMiddleware, store=IdempotencyStore(60, 30), wait_seconds=5
+    )
+    headers = {
+        "Authorization": f"Bearer {create_access_token({'sub': 'user'})}",
+        "Idempotency-Key": "same",
+    }
+
+    async def send_duplicates():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            return await asyncio.gather(
+                *[client.post("/api/tenders/new", headers=headers) for _ in range(3)]
+            )
+
+    responses = asyncio.run(send_duplicates())
+
+    assert calls == [1]
+    assert [response.json() for response in responses] == [{"created": 1}] * 3
@@ -0,0 +1,53 @@
+import os
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from backend.database import get_engine
+from backend.profiler import ProfiledRoute, ProfilerMiddleware
+
+
+def create_profiled_app(output_dir, **overrides):
+    router = APIRouter(route_class=ProfiledRoute)
+
+    @router.get("/api/slow/{item_id}")
+    def slow(item_id: str):
+        with get_engine().connect() as conn:
+            conn.execute(text("SELECT 1"))
+        time.sleep(0.05)
+        return item_id
+
+    app = FastAPI()
+    app.include_router(router)
+    options = dict(output_dir=output_dir, token="secret", sample_rate=0, interval=0.001)
+    options.update(overrides)
+    app.add_middleware(ProfilerMiddleware, **options)
+    return app
+
+
+def test_profile_is_written_when_requested(tmp_path):
+    client = TestClient(create_profiled_app(str(tmp_path)))
+
+    response = client.get(
+        "/api/slow/1", headers={"X-Profile": "secret", "X-Request-ID": "req-1"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Profile-Id"] == "req-1"
+    path = tmp_path / "api_slow_item_id-req-1.folded"
+    lines = path.read_text().splitlines()
+    assert lines
+    assert any("create_profiled_app.<locals>.slow" in line for line in lines)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+
+
+def test_no_profile_without_trigger(tmp_path):
+    client = TestClient(create_profiled_app(str(tmp_path)))
+
+    response = client.get("/api/slow/1", headers={"X-Profile": "wrong"})
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert os.listdir(tmp_path) == []
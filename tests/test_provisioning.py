@@ -0,0 +1,89 @@
+import json
+import sys
+
+import pytest
+
+from backend import provisioning
+from backend.database import get_engine
+from backend.provisioning import main
+from backend.settings import get_project_settings
+
+ROSTER = {
+    "organization": {"name": "New Client", "description": "Onboarding", "type": "LLC"},
+    "employees": [
+        {"username": "alice", "password": "secret-a", "responsible": True},
+        {"username": "bob", "password": "secret-b", "first_name": "Bob"},
+        {"username": "carol", "password": "secret-c", "responsible": True},
+    ],
+}
+
+
+@pytest.fixture
+def provisioning_token(monkeypatch):
+    monkeypatch.setenv("PROVISIONING_TOKEN", "provision-me")
+    get_project_settings.cache_clear()
+    yield {"X-Provisioning-Token": "provision-me"}
+    monkeypatch.delenv("PROVISIONING_TOKEN")
+    get_project_settings.cache_clear()
+
+
+def test_provision_organization(client, db_session, provisioning_token):
+    response = client.post("/api/provision", json=ROSTER, headers=provisioning_token)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["employee_ids"]) == {"alice", "bob", "carol"}
+    assert data["responsible_count"] == 2
+
+    response = client.post(
+        "/api/token", data={"username": "alice", "password": "secret-a"}
+    )
+    assert response.status_code == 200
+    response = client.post(
+        "/api/tenders/new",
+        json={"title": "First", "description": "d", "serviceType": "Delivery"},
+        headers={"Authorization": f"Bearer {response.json()['access_token']}"},
+    )
+    assert response.status_code == 200
+
+    response = client.post("/api/provision", json=ROSTER, headers=provisioning_token)
+    assert response.status_code == 409
+
+
+def test_provision_requires_token(client, db_session, provisioning_token):
+    response = client.post(
+        "/api/provision", json=ROSTER, headers={"X-Provisioning-Token": "wrong"}
+    )
+
+    assert response.status_code == 403
+
+
+def test_provision_cli(db_session, tmp_path, monkeypatch, capsys):
+    roster_path = tmp_path / "roster.json"
+    roster_path.write_text(json.dumps(ROSTER))
+    monkeypatch.setattr(
+        sys, "argv", ["provision", str(roster_path), "--batch-size", "2"]
+    )
+
+    main()
+
+    assert json.loads(capsys.readouterr().out)["responsible_count"] == 2
+
+
+def test_provision_hashes_without_connection(
+    client, db_session, provisioning_token, monkeypatch
+):
+    pool = get_engine().pool
+    before = pool.checkedout()
+    checked_out = []
+
+    def hash_passwords(passwords):
+        checked_out.append(pool.checkedout() - before)
+        return [f"hash-{password}" for password in passwords]
+
+    monkeypatch.setattr(provisioning, "hash_passwords", hash_passwords)
+
+    response = client.post("/api/provision", json=ROSTER, headers=provisioning_token)
+
+    assert response.status_code == 200
+    assert checked_out == [0]
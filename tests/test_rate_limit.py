@@ -0,0 +1,105 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.auth import create_access_token
+from backend import ratelimit
+from backend.ratelimit import InMemoryBucketStore, RateLimitMiddleware
+
+
+def create_limited_app(**overrides):
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    def ping():
+        return "OK"
+
+    @app.post("/api/token")
+    def token():
+        return "token"
+
+    @app.get("/api/tenders")
+    def tenders():
+        return []
+
+    options = dict(
+        store=InMemoryBucketStore(),
+        user_rate=0.001,
+        user_burst=3,
+        ip_rate=0.001,
+        ip_burst=10,
+        route_costs={"/api/token": 5, "/api/ping": 0},
+        max_in_flight=100,
+    )
+    options.update(overrides)
+    app.add_middleware(RateLimitMiddleware, **options)
+    return app
+
+
+def test_route_cost_is_charged_per_ip():
+    client = TestClient(create_limited_app())
+
+    assert client.post("/api/token").status_code == 200
+    assert client.post("/api/token").status_code == 200
+
+    response = client.post("/api/token")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+
+    assert client.get("/api/ping").status_code == 200
+
+
+def test_bucket_per_authenticated_user():
+    client = TestClient(create_limited_app())
+    first = {"Authorization": f"Bearer {create_access_token({'sub': 'first'})}"}
+    second = {"Authorization": f"Bearer {create_access_token({'sub': 'second'})}"}
+
+    for _ in range(3):
+        assert client.get("/api/tenders", headers=first).status_code == 200
+    assert client.get("/api/tenders", headers=first).status_code == 429
+
+    assert client.get("/api/tenders", headers=second).status_code == 200
+
+
+def test_in_flight_cap_returns_503():
+    client = TestClient(create_limited_app(max_in_flight=0))
+
+    response = client.get("/api/tenders")
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_token_bucket_refills():
+    store = InMemoryBucketStore()
+
+    async def scenario():
+        assert await store.take("k", 1, 1000, 1) == 0
+        assert await store.take("k", 1, 1000, 1) > 0
+        await asyncio.sleep(0.01)
+        assert await store.take("k", 1, 1000, 1) == 0
+
+    asyncio.run(scenario())
+
+
+def test_idle_buckets_are_evicted_once_full(monkeypatch):
+    store = InMemoryBucketStore()
+    store.max_keys = 3
+    now = 1000.0
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now)
+
+    def take(key, rate, capacity):
+        return asyncio.run(store.take(key, 1, rate, capacity))
+
+    # Медленное ведро наполняется за 100 с, быстрое — за 0.1 с.
+    take("fast", 10, 2)
+    take("slow", 0.01, 2)
+    now += 1
+    take("new", 10, 2)
+    assert list(store._buckets) == ["slow", "new"]
+
+    # При переполнении вытесняется самое давно использованное ведро.
+    take("other", 10, 2)
+    take("last", 10, 2)
+    assert list(store._buckets) == ["new", "other", "last"]
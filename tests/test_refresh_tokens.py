@@ -0,0 +1,57 @@
+from backend import auth
+from tests.utils import create_test_organization, create_test_user, get_tokens
+
+
+def test_refresh_token_rotates_without_password_check(client, db_session, monkeypatch):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    tokens = get_tokens(client, test_user)
+
+    def fail(*args):
+        raise AssertionError("bcrypt must not run on refresh")
+
+    monkeypatch.setattr(auth.pwd_context, "verify", fail)
+    response = client.post(
+        "/api/token/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+    response = client.get(
+        "/api/bids/my",
+        headers={"Authorization": f"Bearer {refreshed['access_token']}"},
+    )
+    assert response.status_code == 200
+
+
+def test_reused_refresh_token_revokes_the_family(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    first = get_tokens(client, test_user)["refresh_token"]
+    second = client.post("/api/token/refresh", json={"refresh_token": first}).json()[
+        "refresh_token"
+    ]
+
+    response = client.post("/api/token/refresh", json={"refresh_token": first})
+    assert response.status_code == 401
+
+    response = client.post("/api/token/refresh", json={"refresh_token": second})
+    assert response.status_code == 401
+
+
+def test_revoke_refresh_tokens(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    tokens = get_tokens(client, test_user)
+
+    response = client.post(
+        "/api/token/revoke",
+        headers={"Authorization": f"Bearer {tokens['access_token']}"},
+    )
+
+    assert response.json() == {"revoked": 1}
+    response = client.post(
+        "/api/token/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401
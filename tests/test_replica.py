@@ -0,0 +1,91 @@
+import time
+
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from backend.database import (
+    LAST_WRITE_COOKIE,
+    LastWriteCookieMiddleware,
+    ReplicaRouter,
+    get_db,
+    get_replica_router,
+    sticky_key,
+)
+
+
+def test_sticky_window_after_write():
+    router = ReplicaRouter(None, 60, 1, 1)
+    router.mark_write("user:writer")
+
+    assert router.is_sticky("user:writer")
+    assert not router.is_sticky("user:reader")
+
+    router = ReplicaRouter(None, 0, 1, 1)
+    router.mark_write("user:writer")
+
+    assert not router.is_sticky("user:writer")
+
+
+def test_no_replica_configured_uses_primary():
+    router = ReplicaRouter(None, 60, 1, 1)
+
+    assert not router.use_replica("user:reader")
+
+
+def test_unreachable_replica_falls_back_to_primary():
+    replica = create_engine("postgresql://nobody@127.0.0.1:1/none")
+    router = ReplicaRouter(replica, 60, 1, 60)
+
+    assert not router.replica_available()
+    assert not router.use_replica("user:reader")
+
+
+def test_sticky_key_is_the_token_subject():
+    def request(authorization):
+        return Request(
+            {
+                "type": "http",
+                "headers": [(b"authorization", authorization.encode())],
+                "client": ("10.0.0.1", 1234),
+            }
+        )
+
+    first = jwt.encode({"sub": "user-1", "iat": 1}, "secret")
+    second = jwt.encode({"sub": "user-1", "iat": 2}, "secret")
+
+    assert sticky_key(request(f"Bearer {first}")) == "user:user-1"
+    assert sticky_key(request(f"Bearer {second}")) == "user:user-1"
+    assert sticky_key(request("Bearer garbage")) == "10.0.0.1"
+
+
+def test_last_write_cookie_keeps_reads_on_primary(monkeypatch):
+    router = ReplicaRouter(None, 5, 1, 1)
+    monkeypatch.setattr(router, "replica_available", lambda: True)
+
+    assert router.use_replica("user:reader")
+    assert not router.use_replica("user:reader", last_write=time.time() - 1)
+    assert router.use_replica("user:reader", last_write=time.time() - 10)
+    # Время из будущего не продлевает липкость.
+    assert router.use_replica("user:reader", last_write=time.time() + 60)
+
+
+def test_write_sets_last_write_cookie(monkeypatch):
+    monkeypatch.setattr(get_replica_router(), "replica", object())
+    app = FastAPI()
+
+    @app.post("/api/write")
+    def write(db: Session = Depends(get_db)):
+        db.commit()
+
+    @app.get("/api/read")
+    def read(db: Session = Depends(get_db)):
+        return None
+
+    client = TestClient(LastWriteCookieMiddleware(app, max_age=5))
+
+    assert LAST_WRITE_COOKIE not in client.get("/api/read").cookies
+    response = client.post("/api/write")
+    assert abs(float(response.cookies[LAST_WRITE_COOKIE]) - time.time()) < 5
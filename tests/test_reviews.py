@@ -1,3 +1,5 @@
+import uuid
+
 from tests.utils import (
     create_test_organization,
     create_test_user,
@@ -64,3 +66,141 @@ def test_get_reviews_for_bid(client, db_session):
     data = response.json()
     assert len(data) > 0
     assert data[0]["review"] == "Great bid!"
+
+
+def test_add_review_twice(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    test_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    review_data = {"review": "First", "status": "APPROVED"}
+    response = client.post(
+        f"/api/bids/{test_bid.id}/review", json=review_data, headers=headers
+    )
+    assert response.status_code == 200
+
+    response = client.post(
+        f"/api/bids/{test_bid.id}/review", json=review_data, headers=headers
+    )
+    assert response.status_code == 400
+
+
+def test_add_reviews_bulk(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    first_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+    second_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    client.post(
+        f"/api/bids/{first_bid.id}/review",
+        json={"review": "Already reviewed", "status": "APPROVED"},
+        headers=headers,
+    )
+
+    response = client.post(
+        f"/api/tenders/{test_tender.id}/reviews",
+        json={
+            "decisions": [
+                {"bid_id": str(first_bid.id), "review": "Again", "status": "REJECTED"},
+                {"bid_id": str(second_bid.id), "review": "OK", "status": "APPROVED"},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [review["bid_id"] for review in data["created"]] == [str(second_bid.id)]
+    assert data["skipped"] == [str(first_bid.id)]
+
+
+def test_add_reviews_bulk_checks_tender(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    other_organization = create_test_organization(db_session)
+    other_user = create_test_user(db_session, other_organization.id, "other_user")
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    test_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": other_user.username, "password": "password"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    payload = {
+        "decisions": [
+            {"bid_id": str(test_bid.id), "review": "OK", "status": "APPROVED"}
+        ]
+    }
+
+    response = client.post(
+        f"/api/tenders/{test_tender.id}/reviews", json=payload, headers=headers
+    )
+    assert response.status_code == 403
+
+    response = client.post(
+        f"/api/tenders/{uuid.uuid4()}/reviews", json=payload, headers=headers
+    )
+    assert response.status_code == 404
+
+
+def test_get_reviews_for_tender_pagination(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    first_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+    second_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    token = response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    for bid in (first_bid, second_bid):
+        client.post(
+            f"/api/bids/{bid.id}/review",
+            json={"review": "Reviewed", "status": "APPROVED"},
+            headers=headers,
+        )
+
+    params = {"authorUsername": test_user.username, "limit": 1}
+    response = client.get(
+        f"/api/tenders/{test_tender.id}/reviews", params=params, headers=headers
+    )
+    assert response.status_code == 200
+    first_page = response.json()
+    assert len(first_page) == 1
+
+    response = client.get(
+        f"/api/tenders/{test_tender.id}/reviews",
+        params={**params, "cursor": response.headers["X-Next-Cursor"]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    second_page = response.json()
+    assert "X-Next-Cursor" not in response.headers
+    assert {review["bid_id"] for review in first_page + second_page} == {
+        str(first_bid.id),
+        str(second_bid.id),
+    }
+
+    response = client.get(
+        f"/api/tenders/{test_tender.id}/reviews",
+        params={"authorUsername": "unknown"},
+        headers=headers,
+    )
+    assert response.status_code == 404
@@ -0,0 +1,144 @@
+from sqlalchemy import event
+
+from backend.database import get_engine
+from tests.utils import (
+    create_test_organization,
+    create_test_user,
+    create_test_tender,
+    assign_responsibility,
+    create_test_bid,
+    login,
+    count_statements,
+)
+
+
+def test_register_user_statement_count(client, db_session):
+    with count_statements() as statements:
+        response = client.post(
+            "/api/register_user",
+            params={"username": "new_user", "password": "password"},
+        )
+
+    assert response.status_code == 200
+    assert len(statements) == 1
+
+
+def test_create_tender_statement_count(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+    headers = login(client, test_user)
+
+    tender_data = {
+        "title": "New Tender",
+        "description": "New Tender Description",
+        "serviceType": "Construction",
+    }
+    with count_statements() as statements:
+        response = client.post("/api/tenders/new", json=tender_data, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["data"]["created_at"] is not None
+    # user, responsibility check, INSERT ... RETURNING
+    assert len(statements) == 3
+
+
+def test_create_bid_statement_count(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    headers = login(client, test_user)
+
+    bid_data = {"tender_id": str(test_tender.id), "price": 1000.00}
+    with count_statements() as statements:
+        response = client.post("/api/bids/new", json=bid_data, headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["created_at"] is not None
+    # user, tender, responsibility check, INSERT ... RETURNING
+    assert len(statements) == 4
+
+
+def test_edit_bid_statement_count(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    other_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    test_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+    headers = login(client, test_user)
+
+    bid_data = {"tender_id": str(other_tender.id), "description": "Moved", "price": 1}
+    with count_statements() as statements:
+        response = client.patch(
+            f"/api/bids/{test_bid.id}/edit", json=bid_data, headers=headers
+        )
+
+    assert response.status_code == 200
+    # user, UPDATE ... FROM (прежнее предложение) ... RETURNING; SQLite не
+    # возвращает колонки из FROM, и прежний тендер читается отдельным запросом.
+    expected = 2 if get_engine().dialect.name == "postgresql" else 3
+    assert len(statements) == expected
+
+
+def test_add_review_statement_count(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    test_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+    headers = login(client, test_user)
+
+    review_data = {"review": "Looks good", "status": "APPROVED"}
+    with count_statements() as statements:
+        response = client.post(
+            f"/api/bids/{test_bid.id}/review", json=review_data, headers=headers
+        )
+
+    assert response.status_code == 200
+    # user, INSERT ... SELECT ... ON CONFLICT DO NOTHING RETURNING
+    assert len(statements) == 2
+
+
+def test_add_reviews_bulk_statement_count(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    bids = [create_test_bid(db_session, test_tender.id, test_user.id) for _ in range(3)]
+    headers = login(client, test_user)
+
+    decisions = [
+        {"bid_id": str(bid.id), "review": "OK", "status": "APPROVED"} for bid in bids
+    ]
+    with count_statements() as statements:
+        response = client.post(
+            f"/api/tenders/{test_tender.id}/reviews",
+            json={"decisions": decisions},
+            headers=headers,
+        )
+
+    assert response.status_code == 200
+    assert len(response.json()["created"]) == 3
+    # user, INSERT ... SELECT FROM VALUES ... ON CONFLICT DO NOTHING RETURNING
+    assert len(statements) == 2
+
+
+def test_authenticated_reads_use_one_connection(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    headers = login(client, test_user)
+    pool = get_engine().pool
+    # Соединение может держать и сессия самого теста.
+    before = pool.checkedout()
+    checked_out = []
+
+    def on_checkout(*args):
+        checked_out.append(pool.checkedout())
+
+    event.listen(pool, "checkout", on_checkout)
+    try:
+        for path in ("/api/tenders/my", "/api/bids/my"):
+            assert client.get(path, headers=headers).status_code == 200
+    finally:
+        event.remove(pool, "checkout", on_checkout)
+
+    assert checked_out and max(checked_out) == before + 1
@@ -0,0 +1,139 @@
+import time
+
+from backend.database import SessionLocal, cache_ttl
+from backend.settings import get_project_settings
+from backend.shared_cache import LocalCache, SharedCache
+from tests.utils import (
+    create_test_organization,
+    create_test_user,
+    assign_responsibility,
+    create_test_tender,
+)
+
+
+def test_value_written_by_one_worker_is_read_by_another(tmp_path):
+    path = str(tmp_path / "cache")
+    first = SharedCache(path, 1024 * 1024, 64)
+    second = SharedCache(path, 1024 * 1024, 64)
+
+    first.put("tenders", "page", b"[1, 2]", first.generation("tenders"))
+    assert second.get("tenders", "page") == b"[1, 2]"
+
+    second.invalidate("tenders")
+    assert first.get("tenders", "page") is None
+    assert first.get_or_set("tenders", "page", lambda: b"[3]") == b"[3]"
+    assert second.get("tenders", "page") == b"[3]"
+
+
+def test_stale_generation_is_not_served(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache"), 1024 * 1024, 64)
+
+    def load():
+        # Запись успела инвалидировать кэш, пока читали из БД.
+        cache.invalidate("tenders")
+        return b"stale"
+
+    assert cache.get_or_set("tenders", "page", load) == b"stale"
+    assert cache.get("tenders", "page") is None
+
+
+def test_full_segment_wraps_around(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache"), 64 * 1024, 16)
+
+    for i in range(20):
+        cache.put("directory", str(i), bytes(10_000), 0)
+
+    assert cache.get("directory", "19") == bytes(10_000)
+    assert cache.get("directory", "0") is None
+
+
+def test_key_invalidation_keeps_other_keys(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache"), 1024 * 1024, 64)
+    cache.get_or_set("analytics", "tender:1", lambda: b"one")
+    cache.get_or_set("analytics", "tender:2", lambda: b"two")
+
+    cache.invalidate("analytics", "tender:1")
+
+    assert cache.get("analytics", "tender:1") is None
+    assert cache.get("analytics", "tender:2") == b"two"
+
+
+def test_value_expires_after_ttl(tmp_path, monkeypatch):
+    cache = SharedCache(str(tmp_path / "cache"), 1024 * 1024, 64)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.get_or_set("tenders", "replica", lambda: b"old", ttl=2)
+    cache.get_or_set("tenders", "primary", lambda: b"fresh")
+
+    monkeypatch.setattr(time, "time", lambda: now + 3)
+
+    assert cache.get("tenders", "replica") is None
+    assert cache.get("tenders", "primary") == b"fresh"
+
+
+def test_local_cache_generations_and_eviction(monkeypatch):
+    cache = LocalCache(max_entries=2, ttl=30)
+    cache.get_or_set("analytics", "tender:1", lambda: b"one")
+    cache.get_or_set("analytics", "tender:2", lambda: b"two")
+
+    cache.invalidate("analytics", "tender:1")
+    assert cache.get("analytics", "tender:1") is None
+    assert cache.get("analytics", "tender:2") == b"two"
+
+    cache.put("analytics", "tender:3", b"three", cache.generation("analytics"))
+    cache.put("analytics", "tender:4", b"four", cache.generation("analytics"))
+    assert cache.get("analytics", "tender:2") is None
+
+    # Инвалидации других воркеров не видны: значение живет не дольше ttl.
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+    assert cache.get("analytics", "tender:4") is None
+
+
+def test_replica_reads_are_cached_within_max_lag():
+    replica = SessionLocal(info={"replica": True})
+    primary = SessionLocal(info={})
+
+    assert cache_ttl(replica) == get_project_settings().REPLICA_MAX_LAG_SECONDS
+    assert cache_ttl(primary) is None
+
+
+def test_tender_list_is_invalidated_by_writes(client, db_session, enabled_shared_cache):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    assert client.get("/api/tenders").json() == []
+    generation = enabled_shared_cache.generation("tenders")
+
+    tender_data = {
+        "title": "Cached Tender",
+        "description": "Description",
+        "serviceType": "Construction",
+    }
+    response = client.post("/api/tenders/new", json=tender_data, headers=headers)
+    assert response.status_code == 200
+
+    assert enabled_shared_cache.generation("tenders") == generation + 1
+    assert [tender["title"] for tender in client.get("/api/tenders").json()] == [
+        "Cached Tender"
+    ]
+
+
+def test_cached_tender_list_respects_exact_filter(
+    client, db_session, enabled_shared_cache
+):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    create_test_tender(db_session, test_organization.id, test_user.id)
+
+    response = client.get("/api/tenders", params={"serviceType": "Construction"})
+    assert len(response.json()) == 1
+
+    response = client.get("/api/tenders", params={"serviceType": "Construction  "})
+    assert response.json() == []
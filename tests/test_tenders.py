@@ -1,9 +1,14 @@
+import uuid
+
 from tests.utils import (
     create_test_organization,
     create_test_user,
     create_test_tender,
     assign_responsibility,
+    create_test_bid,
+    login,
 )
+from backend.models import Bid, BidStatus
 
 
 def test_get_tenders(client, db_session):
@@ -28,6 +33,41 @@ def test_get_tenders(client, db_session):
 
     assert isinstance(tenders, list)
     assert len(tenders) > 0
+    assert {"description", "responsible_user_id", "updated_at"} <= set(tenders[0])
+
+
+def test_get_published_tenders(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+
+    published_tender = create_test_tender(
+        db_session, test_organization.id, test_user.id
+    )
+    create_test_tender(db_session, test_organization.id, test_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    response = client.patch(
+        f"/api/tenders/{published_tender.id}/publish",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+
+    response = client.get(
+        "/api/tenders", params={"publishedOnly": True, "compact": True}
+    )
+
+    assert response.status_code == 200
+    tenders = response.json()
+    assert [tender["id"] for tender in tenders] == [str(published_tender.id)]
+    assert tenders[0]["status"] == "PUBLISHED"
+    assert "description" not in tenders[0]
 
 
 def test_create_new_tender(client, db_session):
@@ -138,6 +178,67 @@ def test_close_tender(client, db_session):
     assert data["description"] == "Тендер успешно закрыт."
 
 
+def test_close_tender_rejects_open_bids(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    open_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+    canceled_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+    canceled_bid.status = BidStatus.CANCELED
+    db_session.commit()
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    token = response.json()["access_token"]
+
+    response = client.post(
+        f"/api/tenders/{test_tender.id}/close",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200
+
+    db_session.expire_all()
+    assert db_session.get(Bid, open_bid.id).status == BidStatus.REJECTED
+    assert db_session.get(Bid, canceled_bid.id).status == BidStatus.CANCELED
+
+
+def test_closed_tender_bids_cannot_be_reopened(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    open_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    rejected_bid = create_test_bid(db_session, test_tender.id, test_user.id)
+    moved_bid = create_test_bid(db_session, open_tender.id, test_user.id)
+    headers = login(client, test_user)
+
+    response = client.post(f"/api/tenders/{test_tender.id}/close", headers=headers)
+    assert response.status_code == 200
+
+    response = client.post(f"/api/bids/{rejected_bid.id}/publish", headers=headers)
+    assert response.status_code == 409
+    response = client.post(
+        "/api/bids/new",
+        json={"tender_id": str(test_tender.id), "description": "Late", "price": 1},
+        headers=headers,
+    )
+    assert response.status_code == 409
+    response = client.patch(
+        f"/api/bids/{moved_bid.id}/edit",
+        json={"tender_id": str(test_tender.id), "description": "Moved", "price": 1},
+        headers=headers,
+    )
+    assert response.status_code == 409
+
+    db_session.expire_all()
+    assert db_session.get(Bid, rejected_bid.id).status == BidStatus.REJECTED
+    assert db_session.get(Bid, moved_bid.id).tender_id == open_tender.id
+
+
 def test_edit_tender(client, db_session):
     test_organization = create_test_organization(db_session)
     test_user = create_test_user(db_session, test_organization.id)
@@ -209,3 +310,105 @@ def test_rollback_tender_version(client, db_session):
     assert data["success"] is True
     assert data["description"] == "Тендер успешно откатан до версии."
     assert data["data"]["version"] == 1
+
+
+def test_edit_tender_version_conflict(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    updated_data = {
+        "title": "Updated Tender",
+        "description": "Updated Description",
+        "serviceType": "Delivery",
+    }
+    response = client.patch(
+        f"/api/tenders/{test_tender.id}/edit",
+        json=updated_data,
+        headers={"Authorization": f"Bearer {token}", "If-Match": '"1"'},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2-CREATED"'
+
+    response = client.patch(
+        f"/api/tenders/{test_tender.id}/edit",
+        json=updated_data,
+        headers={"Authorization": f"Bearer {token}", "If-Match": '"1"'},
+    )
+    assert response.status_code == 409
+
+
+def test_transitions_with_same_if_match(client, db_session):
+    test_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    assign_responsibility(db_session, test_organization.id, test_user.id)
+    test_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    token = response.json()["access_token"]
+    # Оба клиента видели тендер в одном и том же состоянии.
+    headers = {"Authorization": f"Bearer {token}", "If-Match": '"1-CREATED"'}
+
+    response = client.patch(f"/api/tenders/{test_tender.id}/publish", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1-PUBLISHED"'
+
+    response = client.post(f"/api/tenders/{test_tender.id}/close", headers=headers)
+    assert response.status_code == 409
+
+    headers["If-Match"] = '"1-PUBLISHED"'
+    response = client.post(f"/api/tenders/{test_tender.id}/close", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"1-CLOSED"'
+
+
+def test_tenders_batch(client, db_session):
+    test_organization = create_test_organization(db_session)
+    other_organization = create_test_organization(db_session)
+    test_user = create_test_user(db_session, test_organization.id)
+    other_user = create_test_user(db_session, other_organization.id, "other_user")
+    own_tender = create_test_tender(db_session, test_organization.id, test_user.id)
+    hidden_tender = create_test_tender(db_session, other_organization.id, other_user.id)
+    published_tender = create_test_tender(
+        db_session, other_organization.id, other_user.id
+    )
+    published_tender.status = "PUBLISHED"
+    db_session.commit()
+
+    response = client.post(
+        "/api/token", data={"username": test_user.username, "password": "password"}
+    )
+    token = response.json()["access_token"]
+    unknown_id = str(uuid.uuid4())
+    ids = [
+        str(published_tender.id),
+        unknown_id,
+        str(hidden_tender.id),
+        str(own_tender.id),
+        str(published_tender.id),
+    ]
+
+    response = client.post(
+        "/api/tenders/batch",
+        json={"ids": ids},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [
+        str(published_tender.id),
+        str(own_tender.id),
+    ]
+    assert data["missing"] == [unknown_id, str(hidden_tender.id)]
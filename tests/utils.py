@@ -1,5 +1,10 @@
 import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
 from backend.auth import get_password_hash
+from backend.database import get_engine
 from backend.models import (
     Organization,
     Employee,
@@ -92,3 +97,32 @@ def create_test_review(db_session, bid_id, reviewer_id, review, status):
         f"Создан отзыв: {bid_review.id} для предложения {bid_id} от рецензента {reviewer_id}"
     )
     return bid_review
+
+
+def get_tokens(client, user):
+    response = client.post(
+        "/api/token", data={"username": user.username, "password": "password"}
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def login(client, user):
+    return {"Authorization": f"Bearer {get_tokens(client, user)['access_token']}"}
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        # SET LOCAL (таймауты транзакции на PostgreSQL) — настройка, а не запрос.
+        if not statement.lstrip().upper().startswith("SET LOCAL"):
+            statements.append(statement)
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)